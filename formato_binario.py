@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Formato binario de instancias y conversor desde/hacia el formato de texto .in.
+
+Una instancia binaria es un directorio con un fichero .npy por parámetro
+(C.npy, O.npy, COST.npy, d.npy, p.npy, kd.npy, kp.npy, n.npy). Cada .npy lleva
+su propia cabecera (dtype y forma), así que se abren con
+np.load(mmap_mode='r') sin copiar ni parsear los datos.
+
+Tipos de instancia (los mismos que leen los scripts de cada parte):
+  p1   gen-basico.py  ->  COST
+  p21  gen-1.py       ->  n, kd, kp, d, p
+  p22  gen-2.py       ->  C, O
+"""
+import os
+import re
+import sys
+import argparse
+import numpy as np
+
+KINDS = {
+    "p1": ("COST",),
+    "p21": ("n", "kd", "kp", "d", "p"),
+    "p22": ("C", "O"),
+}
+
+
+def is_binary(path):
+    """Las instancias binarias son directorios; las de texto, ficheros."""
+    return os.path.isdir(path)
+
+
+def load(path):
+    """Devuelve un dict nombre -> array mapeado en memoria (solo lectura) con los .npy del directorio."""
+    arrays = {}
+    for name in os.listdir(path):
+        if name.endswith(".npy"):
+            arrays[name[:-4]] = np.load(os.path.join(path, name), mmap_mode="r")
+    return arrays
+
+
+def save(path, arrays):
+    """Guarda cada array como <path>/<nombre>.npy."""
+    os.makedirs(path, exist_ok=True)
+    for name, value in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), value)
+
+
+def check_p21(n, d, p):
+    """Comprueba n, d y p de una instancia p21 como gen-1.py. Lanza ValueError con el motivo."""
+    if n < 0:
+        raise ValueError(f"El número de franjas ({n}) no puede ser negativo.")
+    if len(p) != len(d):
+        raise ValueError(f"El número de valores 'p' ({len(p)}) no coincide con el número de autobuses ({len(d)}).")
+    for name, values in (("d", d), ("p", p)):
+        values = np.asarray(values, dtype=float)
+        bad = np.flatnonzero((values < 0) | (values != np.floor(values)))
+        if len(bad):
+            raise ValueError(f"El valor {name} en la posición {bad[0]} ({values[bad[0]]}) debe ser un entero no negativo.")
+
+
+def check_p22(C, O):
+    """Comprueba C y O de una instancia p22 como gen-2.py. Lanza ValueError con el motivo."""
+    C, O = np.asarray(C), np.asarray(O)
+    if C.ndim != 2 or C.shape[0] != C.shape[1] or O.ndim != 2:
+        raise ValueError("C debe ser una matriz cuadrada y O una matriz.")
+    if (C < 0).any():
+        raise ValueError("C contiene un elemento negativo.")
+    asym = np.argwhere(C != C.T)
+    if len(asym):
+        i, j = asym[0]
+        raise ValueError(f"C no es simétrica en posición ({i+1},{j+1}).")
+    if not np.isin(O, (0, 1)).all():
+        raise ValueError("la matriz O debe ser binaria (0/1).")
+
+
+def _numbers(line, dtype=float):
+    return np.array(re.findall(r"[0-9.]+", line), dtype=dtype)
+
+
+def read_text(path, kind):
+    """Lee una instancia en formato de texto .in sin validarla (la validan los scripts)."""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [l.strip() for l in f if l.strip()]
+
+    if kind == "p1":
+        n_t, n_a = _numbers(lines[0], int)
+        return {"COST": np.array([_numbers(l) for l in lines[1:1 + n_t]]).reshape(n_t, n_a)}
+    if kind == "p21":
+        n, _ = _numbers(lines[0], int)
+        kd, kp = _numbers(lines[1])
+        return {"n": np.array(n), "kd": np.array(kd), "kp": np.array(kp),
+                "d": _numbers(lines[2]), "p": _numbers(lines[3])}
+    if kind == "p22":
+        n, m, u = _numbers(lines[0], int)
+        C = np.array([_numbers(l) for l in lines[1:1 + m]]).reshape(m, m)
+        O = np.array([_numbers(l, int) for l in lines[1 + m:1 + m + n]], dtype=np.int32).reshape(n, u)
+        return {"C": C, "O": O}
+    raise ValueError(f"Tipo de instancia desconocido: {kind}")
+
+
+def _fmt(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+def write_text(path, kind, arrays):
+    """Escribe una instancia en el formato de texto .in que leen los scripts."""
+    with open(path, "w", encoding="utf-8") as f:
+        if kind == "p1":
+            COST = arrays["COST"]
+            f.write(f"{COST.shape[0]} {COST.shape[1]}\n")
+            for row in COST:
+                f.write(" ".join(_fmt(v) for v in row) + "\n")
+        elif kind == "p21":
+            f.write(f"{int(arrays['n'])} {len(arrays['d'])}\n")
+            f.write(f"{float(arrays['kd'])} {float(arrays['kp'])}\n")
+            f.write(" ".join(_fmt(v) for v in arrays["d"]) + "\n")
+            f.write(" ".join(_fmt(v) for v in arrays["p"]) + "\n")
+        elif kind == "p22":
+            C, O = arrays["C"], arrays["O"]
+            f.write(f"{O.shape[0]} {C.shape[0]} {O.shape[1]}\n")
+            for row in C:
+                f.write(" ".join(_fmt(v) for v in row) + "\n")
+            for row in O:
+                f.write(" ".join(str(int(v)) for v in row) + "\n")
+        else:
+            raise ValueError(f"Tipo de instancia desconocido: {kind}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convierte instancias entre el formato de texto .in y el formato binario.")
+    parser.add_argument("kind", choices=sorted(KINDS), help="Tipo de instancia (p1, p21 o p22).")
+    parser.add_argument("src", help="Instancia de origen (fichero .in o directorio binario).")
+    parser.add_argument("dst", help="Instancia de destino (directorio binario o fichero .in).")
+    args = parser.parse_args()
+
+    try:
+        if is_binary(args.src):
+            arrays = load(args.src)
+            missing = [name for name in KINDS[args.kind] if name not in arrays]
+            if missing:
+                print(f"Error: a la instancia '{args.src}' le faltan los parámetros {', '.join(missing)}.")
+                sys.exit(1)
+            write_text(args.dst, args.kind, arrays)
+        else:
+            save(args.dst, read_text(args.src, args.kind))
+    except FileNotFoundError:
+        print(f"Error: el fichero '{args.src}' no existe.")
+        sys.exit(1)
+    except (ValueError, IndexError):
+        print(f"Error: formato de datos incorrecto en '{args.src}'.")
+        sys.exit(1)
+
+    print(f"Instancia '{args.src}' convertida a '{args.dst}'.")
@@ -0,0 +1,290 @@
+"""
+Motor GLPK en proceso: llama a libglpk con ctypes en lugar de lanzar glpsol.
+
+Los modelos se construyen directamente desde los arrays de Python (sin .mod ni
+.dat) y los valores de las columnas se leen de memoria. Un mismo objeto de
+problema se reutiliza entre instancias con la misma forma: set_data() solo
+cambia coeficientes del objetivo y cotas de filas/columnas. lote_libglpk.py
+resuelve así lotes de instancias en un solo proceso.
+
+La biblioteca se busca con ctypes.util.find_library("glpk"); la variable de
+entorno GLPK_LIB permite indicar la ruta de libglpk.so explícitamente.
+"""
+import os
+import ctypes
+import ctypes.util
+import numpy as np
+
+# Constants from glpk.h
+GLP_MIN = 1
+GLP_LO, GLP_UP, GLP_DB, GLP_FX = 2, 3, 4, 5
+GLP_BV = 3
+GLP_ON, GLP_OFF = 1, 0
+GLP_MSG_OFF = 0
+GLP_OPT, GLP_FEAS, GLP_NOFEAS = 5, 2, 4
+GLP_ENOPFS, GLP_ENODFS = 0x0A, 0x0B
+
+
+class GlpkError(Exception):
+    """La biblioteca no está disponible o el problema no tiene solución óptima."""
+
+
+# Versions whose glp_iocp layout has been checked against _Iocp. glp_init_iocp
+# writes the whole struct, so any other layout would corrupt memory silently.
+CHECKED_VERSIONS = ("5.0",)
+
+
+class _Iocp(ctypes.Structure):
+    """glp_iocp de GLPK 5.0 (foo_bar es la reserva que deja glpk.h para futuros campos)."""
+    _fields_ = [
+        ("msg_lev", ctypes.c_int), ("br_tech", ctypes.c_int), ("bt_tech", ctypes.c_int),
+        ("tol_int", ctypes.c_double), ("tol_obj", ctypes.c_double),
+        ("tm_lim", ctypes.c_int), ("out_frq", ctypes.c_int), ("out_dly", ctypes.c_int),
+        ("cb_func", ctypes.c_void_p), ("cb_info", ctypes.c_void_p), ("cb_size", ctypes.c_int),
+        ("pp_tech", ctypes.c_int), ("mip_gap", ctypes.c_double),
+        ("mir_cuts", ctypes.c_int), ("gmi_cuts", ctypes.c_int),
+        ("cov_cuts", ctypes.c_int), ("clq_cuts", ctypes.c_int), ("presolve", ctypes.c_int),
+        ("binarize", ctypes.c_int), ("fp_heur", ctypes.c_int), ("ps_heur", ctypes.c_int),
+        ("ps_tm_lim", ctypes.c_int), ("sr_heur", ctypes.c_int), ("use_sol", ctypes.c_int),
+        ("save_sol", ctypes.c_char_p), ("alien", ctypes.c_int), ("flip", ctypes.c_int),
+        ("foo_bar", ctypes.c_double * 23),
+    ]
+
+
+_lib = None
+
+
+def library():
+    """Carga libglpk una sola vez y declara las firmas que se usan."""
+    global _lib
+    if _lib is not None:
+        return _lib
+
+    path = os.environ.get("GLPK_LIB") or ctypes.util.find_library("glpk")
+    if not path:
+        raise GlpkError("No se encontró libglpk. Instala GLPK o indica su ruta en GLPK_LIB.")
+    try:
+        lib = ctypes.CDLL(path)
+    except OSError as e:
+        raise GlpkError(f"No se pudo cargar libglpk ('{path}'): {e}")
+
+    lib.glp_version.restype = ctypes.c_char_p
+    lib.glp_version.argtypes = []
+    version = lib.glp_version().decode()
+    if version not in CHECKED_VERSIONS:
+        raise GlpkError(f"libglpk {version} ('{path}') no está soportada: la estructura glp_iocp solo se ha "
+                        f"comprobado para las versiones {', '.join(CHECKED_VERSIONS)}.")
+
+    P, i, d = ctypes.c_void_p, ctypes.c_int, ctypes.c_double
+    signatures = {
+        "glp_create_prob": (P, []),
+        "glp_delete_prob": (None, [P]),
+        "glp_set_obj_dir": (None, [P, i]),
+        "glp_add_rows": (i, [P, i]),
+        "glp_add_cols": (i, [P, i]),
+        "glp_set_row_bnds": (None, [P, i, i, d, d]),
+        "glp_set_col_kind": (None, [P, i, i]),
+        "glp_set_obj_coef": (None, [P, i, d]),
+        "glp_load_matrix": (None, [P, i, ctypes.POINTER(i), ctypes.POINTER(i), ctypes.POINTER(d)]),
+        "glp_init_iocp": (None, [ctypes.POINTER(_Iocp)]),
+        "glp_intopt": (i, [P, ctypes.POINTER(_Iocp)]),
+        "glp_mip_status": (i, [P]),
+        "glp_mip_obj_val": (d, [P]),
+        "glp_mip_col_val": (d, [P, i]),
+        "glp_term_out": (i, [i]),
+    }
+    for name, (restype, argtypes) in signatures.items():
+        func = getattr(lib, name)
+        func.restype = restype
+        func.argtypes = argtypes
+
+    lib.glp_term_out(GLP_OFF)
+    _lib = lib
+    return lib
+
+
+class Problema:
+    """Problema MIP binario de GLPK (minimización) construido a partir de arrays."""
+
+    def __init__(self, num_rows, num_cols, rows, cols, coefs):
+        """Crea num_rows filas y num_cols columnas binarias con la matriz dispersa (rows, cols, coefs), índices desde 0."""
+        self.lib = library()
+        self.lp = self.lib.glp_create_prob()
+        self.num_rows, self.num_cols = num_rows, num_cols
+        self.lib.glp_set_obj_dir(self.lp, GLP_MIN)
+        if num_rows:
+            self.lib.glp_add_rows(self.lp, num_rows)
+        if num_cols:
+            self.lib.glp_add_cols(self.lp, num_cols)
+        for j in range(1, num_cols + 1):
+            self.lib.glp_set_col_kind(self.lp, j, GLP_BV)
+
+        # GLPK arrays are 1-based: position 0 is ignored
+        ne = len(coefs)
+        ia = np.ascontiguousarray(np.concatenate([[0], np.asarray(rows) + 1]), dtype=np.intc)
+        ja = np.ascontiguousarray(np.concatenate([[0], np.asarray(cols) + 1]), dtype=np.intc)
+        ar = np.ascontiguousarray(np.concatenate([[0.0], np.asarray(coefs, dtype=float)]), dtype=np.double)
+        self.lib.glp_load_matrix(self.lp, ne,
+                                 ia.ctypes.data_as(ctypes.POINTER(ctypes.c_int)),
+                                 ja.ctypes.data_as(ctypes.POINTER(ctypes.c_int)),
+                                 ar.ctypes.data_as(ctypes.POINTER(ctypes.c_double)))
+
+    def __del__(self):
+        if getattr(self, "lp", None):
+            self.lib.glp_delete_prob(self.lp)
+            self.lp = None
+
+    def set_row_bounds(self, rows, lower, upper, kind):
+        """Cambia las cotas de las filas indicadas (índices desde 0)."""
+        lower = np.broadcast_to(lower, np.shape(rows))
+        upper = np.broadcast_to(upper, np.shape(rows))
+        for r, lo, up in zip(rows, lower, upper):
+            self.lib.glp_set_row_bnds(self.lp, int(r) + 1, kind, float(lo), float(up))
+
+    def set_objective(self, coefs, constant=0.0):
+        """Coeficientes del objetivo para todas las columnas y término constante."""
+        self.lib.glp_set_obj_coef(self.lp, 0, float(constant))
+        for j, c in enumerate(coefs, start=1):
+            self.lib.glp_set_obj_coef(self.lp, j, float(c))
+
+    def solve(self):
+        """Resuelve con branch-and-cut (presolve incluido) y devuelve (objetivo, valores de las columnas)."""
+        params = _Iocp()
+        self.lib.glp_init_iocp(ctypes.byref(params))
+        params.msg_lev = GLP_MSG_OFF
+        params.presolve = GLP_ON
+
+        ret = self.lib.glp_intopt(self.lp, ctypes.byref(params))
+        if ret == GLP_ENOPFS:
+            raise GlpkError("El problema no tiene una solución factible (es infactible).")
+        if ret == GLP_ENODFS:
+            raise GlpkError("El problema es no acotado.")
+        status = self.lib.glp_mip_status(self.lp)
+        if status == GLP_NOFEAS:
+            raise GlpkError("El problema no tiene una solución factible (es infactible).")
+        if status != GLP_OPT:
+            raise GlpkError(f"GLPK terminó sin solución óptima (código {ret}, estado {status}).")
+
+        values = np.array([self.lib.glp_mip_col_val(self.lp, j) for j in range(1, self.num_cols + 1)])
+        return self.lib.glp_mip_obj_val(self.lp), values
+
+
+class ModeloParte21:
+    """
+    parte-2-1.mod para m autobuses y n franjas. Columnas x[i,j] en orden i*n + j;
+    filas: ConstraintFranjas (n) y ConstraintAutobuses (m).
+    """
+
+    def __init__(self, m, n):
+        self.m, self.n = m, n
+        i, j = np.divmod(np.arange(m * n), max(n, 1))
+        rows = np.concatenate([j, n + i])
+        cols = np.concatenate([np.arange(m * n)] * 2)
+        self.problema = Problema(n + m, m * n, rows, cols, np.ones(2 * m * n))
+        self.problema.set_row_bounds(range(n + m), 0, 1, GLP_UP)
+
+    def set_data(self, kd, kp, d, p):
+        """Carga kd, kp y los m valores de d y p."""
+        d, p = np.asarray(d, dtype=float), np.asarray(p, dtype=float)
+        # kd*d*x + kp*p*(1 - x) = kp*p + (kd*d - kp*p)*x
+        self.problema.set_objective(np.repeat(kd * d - kp * p, self.n), kp * p.sum())
+
+    def solve(self):
+        """Devuelve (objetivo, {autobús: franja}) con índices desde 0."""
+        objective, values = self.problema.solve()
+        x = values.reshape(self.m, self.n) > 0.5
+        return objective, {int(i): int(j) for i, j in np.argwhere(x)}
+
+    @property
+    def size(self):
+        """Columnas y filas tal y como las cuenta glpsol (con la fila del objetivo)."""
+        return self.problema.num_cols, self.problema.num_rows + 1
+
+
+class ModeloParte22:
+    """
+    parte-2-2.mod para m autobuses, n franjas y u talleres, o parte-2-2-rh.mod si deferrable.
+
+    Columnas: x[i,s,t] (m*n*u), y[i,j,s] para i < j (pares*n) y, si deferrable, z[i] (m).
+    Filas: Availability (n*u), Assignation (m), Deferred (1, si deferrable),
+    y_up1, y_up2 e y_low (pares*n cada una).
+    """
+
+    def __init__(self, m, n, u, deferrable=False):
+        self.m, self.n, self.u = m, n, u
+        self.deferrable = deferrable
+        pi, pj = np.triu_indices(m, k=1)
+        self.pairs = (pi, pj)
+        num_pairs = len(pi)
+
+        nx, ny, nz = m * n * u, num_pairs * n, m if deferrable else 0
+        x_col = np.arange(nx).reshape(m, n, u)
+        y_col = nx + np.arange(ny).reshape(num_pairs, n)
+        z_col = nx + ny + np.arange(nz)
+
+        r_avail = 0
+        r_assign = n * u
+        r_defer = r_assign + m
+        r_up1 = r_defer + (1 if deferrable else 0)
+        r_up2 = r_up1 + ny
+        r_low = r_up2 + ny
+        num_rows = r_low + ny
+
+        rows, cols, coefs = [], [], []
+
+        def add(r, c, v):
+            r, c = np.broadcast_arrays(np.asarray(r), np.asarray(c))
+            rows.append(r.ravel())
+            cols.append(c.ravel())
+            coefs.append(np.broadcast_to(v, r.shape).ravel().astype(float))
+
+        i, s, t = np.indices((m, n, u))
+        add(r_avail + s * u + t, x_col, 1)               # sum_i x[i,s,t] <= o[s,t]
+        add(r_assign + i, x_col, 1)                      # sum_{s,t} x[i,s,t] (+ z[i]) = 1
+        if deferrable:
+            add(r_assign + np.arange(m), z_col, 1)
+            add(np.full(m, r_defer), z_col, 1)           # sum_i z[i] <= max_aplazados
+
+        k, s2 = np.indices((num_pairs, n))
+        y_row = k * n + s2
+        add(r_up1 + y_row, y_col, 1)                     # y - sum_t x[i,s,t] <= 0
+        add(r_up1 + y_row[..., None], x_col[pi], -1)
+        add(r_up2 + y_row, y_col, 1)                     # y - sum_t x[j,s,t] <= 0
+        add(r_up2 + y_row[..., None], x_col[pj], -1)
+        add(r_low + y_row, y_col, 1)                     # y - sum_t x[i,s,t] - sum_t x[j,s,t] >= -1
+        add(r_low + y_row[..., None], x_col[pi], -1)
+        add(r_low + y_row[..., None], x_col[pj], -1)
+
+        self.problema = Problema(num_rows, nx + ny + nz, np.concatenate(rows),
+                                 np.concatenate(cols), np.concatenate(coefs))
+        self.rows = {"avail": r_avail, "assign": r_assign, "defer": r_defer,
+                     "up1": r_up1, "up2": r_up2, "low": r_low}
+        self.problema.set_row_bounds(range(r_assign, r_assign + m), 1, 1, GLP_FX)
+        self.problema.set_row_bounds(range(r_up1, r_low), 0, 0, GLP_UP)
+        self.problema.set_row_bounds(range(r_low, num_rows), -1, 0, GLP_LO)
+
+    def set_data(self, C, O, max_deferred=None):
+        """Carga C (m x m), O (n x u) y, en el modelo de ventana, max_aplazados."""
+        m, n, u = self.m, self.n, self.u
+        pi, pj = self.pairs
+        C = np.asarray(C, dtype=float)
+
+        coefs = np.zeros(self.problema.num_cols)
+        coefs[m * n * u:m * n * u + len(pi) * n] = np.repeat(C[pi, pj], n)
+        self.problema.set_objective(coefs)
+
+        r = self.rows
+        self.problema.set_row_bounds(range(r["avail"], r["avail"] + n * u), 0, np.asarray(O, dtype=float).ravel(), GLP_UP)
+        if self.deferrable:
+            self.problema.set_row_bounds([r["defer"]], 0, float(max_deferred or 0), GLP_UP)
+
+    def solve(self):
+        """Devuelve (objetivo, {autobús: (franja, taller)}) con índices desde 0."""
+        objective, values = self.problema.solve()
+        x = values[:self.m * self.n * self.u].reshape(self.m, self.n, self.u) > 0.5
+        return objective, {int(i): (int(s), int(t)) for i, s, t in np.argwhere(x)}
+
+    @property
+    def size(self):
+        """Columnas y filas tal y como las cuenta glpsol (con la fila del objetivo)."""
+        return self.problema.num_cols, self.problema.num_rows + 1
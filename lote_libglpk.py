@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Resuelve un lote de instancias de la parte 2 en un solo proceso con libglpk.
+
+gen-1.py y gen-2.py resuelven una instancia por ejecución. Aquí los problemas
+de glpk_lib se guardan por forma y se reutilizan entre las instancias del lote:
+para cada instancia con una forma ya vista solo se llama a set_data(), que
+cambia coeficientes del objetivo y cotas, sin volver a construir la matriz.
+
+Tipos de instancia (los de formato_binario.py):
+  p21  parte-2-1.mod (como gen-1.py --engine libglpk)
+  p22  parte-2-2.mod (como gen-2.py --engine libglpk)
+"""
+import sys
+import time
+import argparse
+
+import formato_binario
+import glpk_lib
+
+
+def read_instance(path, kind):
+    """Lee y valida una instancia de texto o binaria. Devuelve sus arrays o lanza ValueError."""
+    if formato_binario.is_binary(path):
+        arrays = formato_binario.load(path)
+        missing = [name for name in formato_binario.KINDS[kind] if name not in arrays]
+        if missing:
+            raise ValueError(f"a la instancia binaria '{path}' le faltan los parámetros {', '.join(missing)}.")
+    else:
+        try:
+            arrays = formato_binario.read_text(path, kind)
+        except FileNotFoundError:
+            raise ValueError(f"el fichero '{path}' no existe.")
+        except (ValueError, IndexError):
+            raise ValueError(f"formato de datos incorrecto en '{path}'.")
+
+    if kind == "p21":
+        formato_binario.check_p21(int(arrays["n"]), arrays["d"], arrays["p"])
+        if float(arrays["kd"]) < 0 or float(arrays["kp"]) < 0:
+            raise ValueError(f"Las constantes kd ({float(arrays['kd'])}) y kp ({float(arrays['kp'])}) no pueden ser negativas.")
+    else:
+        formato_binario.check_p22(arrays["C"], arrays["O"])
+    return arrays
+
+
+def solve(arrays, kind, models):
+    """Resuelve una instancia reutilizando el problema de su forma. Devuelve (objetivo, variables, restricciones, reutilizado)."""
+    if kind == "p21":
+        shape = (len(arrays["d"]), int(arrays["n"]))
+    else:
+        shape = (arrays["C"].shape[0],) + arrays["O"].shape
+
+    model = models.get(shape)
+    reused = model is not None
+    if not reused:
+        model = models[shape] = (glpk_lib.ModeloParte21 if kind == "p21" else glpk_lib.ModeloParte22)(*shape)
+
+    if kind == "p21":
+        model.set_data(float(arrays["kd"]), float(arrays["kp"]), arrays["d"], arrays["p"])
+    else:
+        model.set_data(arrays["C"], arrays["O"])
+    objective_value, _ = model.solve()
+    return (objective_value,) + model.size + (reused,)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resuelve un lote de instancias con libglpk reutilizando los problemas de la misma forma.")
+    parser.add_argument("kind", choices=["p21", "p22"], help="Tipo de instancia (p21 o p22).")
+    parser.add_argument("instances", nargs="+", help="Instancias (ficheros .in o directorios binarios).")
+    args = parser.parse_args()
+
+    models = {}
+    failed = 0
+    start = time.perf_counter()
+    for path in args.instances:
+        t0 = time.perf_counter()
+        try:
+            objective_value, cols, rows, reused = solve(read_instance(path, args.kind), args.kind, models)
+        except (ValueError, glpk_lib.GlpkError) as e:
+            print(f"{path}: Error: {e}")
+            failed += 1
+            if isinstance(e, glpk_lib.GlpkError) and not models:
+                sys.exit(1)  # libglpk is missing or unsupported: nothing in the batch can be solved
+            continue
+        print(f"{path}: Coste total: {objective_value}, Variables: {cols}, Restricciones: {rows}, "
+              f"Tiempo: {time.perf_counter() - t0:.4f}s{' (problema reutilizado)' if reused else ''}")
+
+    print(f"\nInstancias: {len(args.instances)}, Fallidas: {failed}, Problemas construidos: {len(models)}, "
+          f"Tiempo total: {time.perf_counter() - start:.4f}s")
+    if failed:
+        sys.exit(1)
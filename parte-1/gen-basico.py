@@ -4,26 +4,39 @@
 import sys
 import re
 import subprocess
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import formato_binario
 
 if len(sys.argv) != 3:
-    print("Uso: ./gen-basico.py <fichero-entrada.in> <fichero-salida.dat>")
+    print("Uso: ./gen-basico.py <fichero-entrada.in | directorio-binario> <fichero-salida.dat>")
     sys.exit(1)
 
 infile = sys.argv[1]
 outfile = sys.argv[2]
 
 # ---------- 1. Leer fichero de entrada ----------
-with open(infile, "r", encoding="utf-8") as f:
-    lines = [l.strip() for l in f if l.strip()]
-
-n_t, n_a = map(int, lines[0].split())
-COST = []
-for i in range(1, 1 + n_t):
-    fila = list(map(float, lines[i].split()))
-    if len(fila) != n_a:
-        print(f"Error: la fila {i} no tiene {n_a} valores.")
+if formato_binario.is_binary(infile):
+    # Instancia binaria: COST se mapea en memoria sin parsear ni copiar
+    arrays = formato_binario.load(infile)
+    if "COST" not in arrays or arrays["COST"].ndim != 2:
+        print(f"Error: la instancia binaria '{infile}' debe contener una matriz COST.npy.")
         sys.exit(1)
-    COST.append(fila)
+    COST = arrays["COST"]
+    n_t, n_a = COST.shape
+else:
+    with open(infile, "r", encoding="utf-8") as f:
+        lines = [l.strip() for l in f if l.strip()]
+
+    n_t, n_a = map(int, lines[0].split())
+    COST = []
+    for i in range(1, 1 + n_t):
+        fila = list(map(float, lines[i].split()))
+        if len(fila) != n_a:
+            print(f"Error: la fila {i} no tiene {n_a} valores.")
+            sys.exit(1)
+        COST.append(fila)
 
 # ---------- 2. Generar fichero .dat ----------
 with open(outfile, "w", encoding="utf-8") as f:
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reasignación incremental para el problema de p1_hyo.mod (asignación taller/autobús).
+
+Asignacion resuelve la instancia una vez con el método húngaro y guarda la
+asignación óptima y los potenciales duales (u por taller, v por autobús).
+Cuando cambian k costes, update() solo vuelve a aumentar las filas afectadas:
+cada una es un camino aumentante O(n²), así que el coste es O(k·n²) en lugar
+de reescribir el .dat y resolver desde cero con glpsol.
+
+Uso: ./reasignacion.py <fichero-entrada.in | directorio-binario> <fichero-cambios>
+El fichero de cambios tiene una edición por línea: "T<i> A<j> <coste nuevo>".
+"""
+
+import os
+import re
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import formato_binario
+
+
+class Asignacion:
+    """Asignación óptima de un COST cuadrado (talleres x autobuses) con potenciales duales."""
+
+    def __init__(self, COST):
+        COST = np.array(COST, dtype=float)
+        if COST.ndim != 2 or COST.shape[0] != COST.shape[1]:
+            raise ValueError("p1_hyo.mod solo es factible con tantos talleres como autobuses.")
+        self.n = n = COST.shape[0]
+        self.COST = COST
+
+        # 1-based as in the classic Hungarian algorithm: column 0 is the virtual root
+        self.u = np.zeros(n + 1)               # potential of each workshop (row)
+        self.v = np.zeros(n + 1)               # potential of each bus (column)
+        self.row_of = np.zeros(n + 1, dtype=int)  # row_of[j] = workshop assigned to bus j (0 = free)
+
+        for i in range(1, n + 1):
+            self._augment(i)
+
+    def _augment(self, i):
+        """Asigna la fila libre i por el camino aumentante más corto en costes reducidos (O(n²))."""
+        n, u, v, row_of = self.n, self.u, self.v, self.row_of
+        minv = np.full(n + 1, np.inf)
+        way = np.zeros(n + 1, dtype=int)
+        used = np.zeros(n + 1, dtype=bool)
+
+        row_of[0] = i
+        j0 = 0
+        while True:
+            used[j0] = True
+            i0 = row_of[j0]
+            free = ~used
+            free[0] = False
+            cur = self.COST[i0 - 1] - u[i0] - v[1:]
+            better = free[1:] & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+
+            candidates = np.flatnonzero(free)
+            j1 = candidates[np.argmin(minv[candidates])]
+            delta = minv[j1]
+
+            u[row_of[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+
+            j0 = j1
+            if row_of[j0] == 0:
+                break
+
+        # Flip the assignment along the path back to the root
+        while j0:
+            j1 = way[j0]
+            row_of[j0] = row_of[j1]
+            j0 = j1
+        row_of[0] = 0
+
+    def update(self, changes):
+        """
+        Aplica un lote de cambios [(taller, autobús, coste nuevo), ...] (índices desde 0)
+        y repara la optimalidad. Devuelve el número de filas que se han vuelto a aumentar.
+        """
+        rows = set()
+        for i, j, cost in changes:
+            self.COST[i, j] = cost
+            rows.add(i + 1)
+
+        # First restore dual feasibility of every edited row, then re-augment the freed ones
+        col_of = self.assignment
+        freed = []
+        for i in sorted(rows):
+            # Largest potential that keeps every reduced cost of row i non-negative
+            self.u[i] = np.min(self.COST[i - 1] - self.v[1:])
+            j = col_of[i - 1] + 1
+            if self.COST[i - 1, j - 1] - self.u[i] - self.v[j] > 1e-9:
+                # The assigned edge is no longer tight: the row has to be assigned again
+                self.row_of[j] = 0
+                freed.append(i)
+
+        for i in freed:
+            self._augment(i)
+        return len(freed)
+
+    @property
+    def assignment(self):
+        """Autobús (índice desde 0) asignado a cada taller."""
+        col_of = np.empty(self.n, dtype=int)
+        col_of[self.row_of[1:] - 1] = np.arange(self.n)
+        return col_of
+
+    @property
+    def objective(self):
+        return float(self.COST[np.arange(self.n), self.assignment].sum())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: ./reasignacion.py <fichero-entrada.in | directorio-binario> <fichero-cambios>")
+        sys.exit(1)
+
+    # ---------- 1. Leer instancia y resolver ----------
+    if formato_binario.is_binary(sys.argv[1]):
+        arrays = formato_binario.load(sys.argv[1])
+        if "COST" not in arrays or arrays["COST"].ndim != 2:
+            print(f"Error: la instancia binaria '{sys.argv[1]}' debe contener una matriz COST.npy.")
+            sys.exit(1)
+        COST = arrays["COST"]
+        n_t, n_a = COST.shape
+    else:
+        with open(sys.argv[1], "r", encoding="utf-8") as f:
+            lines = [l.strip() for l in f if l.strip()]
+        n_t, n_a = map(int, lines[0].split())
+        COST = [list(map(float, lines[i].split())) for i in range(1, 1 + n_t)]
+
+    try:
+        asignacion = Asignacion(COST)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Objetivo óptimo inicial: {asignacion.objective}")
+
+    # ---------- 2. Aplicar cambios y reparar ----------
+    changes = []
+    with open(sys.argv[2], "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            m = re.fullmatch(r"T(\d+)\s+A(\d+)\s+([-+0-9.eE]+)", line.strip())
+            if not m:
+                print(f"Error: línea de cambios no válida: '{line.strip()}'")
+                sys.exit(1)
+            t, a = int(m.group(1)), int(m.group(2))
+            if not (1 <= t <= n_t and 1 <= a <= n_a):
+                print(f"Error: T{t} A{a} está fuera de la matriz de costes.")
+                sys.exit(1)
+            changes.append((t - 1, a - 1, float(m.group(3))))
+
+    repaired = asignacion.update(changes)
+
+    # ---------- 3. Mostrar resultados ----------
+    print("\n===== RESULTADOS =====")
+    print(f"Objetivo óptimo: {asignacion.objective}, Cambios: {len(changes)}, Filas reasignadas: {repaired}\n")
+    for t, a in enumerate(asignacion.assignment):
+        print(f"Taller T{t+1} ← Autobús A{a+1}")
+    print("=======================")
@@ -3,11 +3,21 @@ import sys
 import re
 import subprocess
 import argparse
+import time
+import os
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import formato_binario
+import glpk_lib
 
 parser = argparse.ArgumentParser(description="Genera un fichero .dat para el problema 2.2.1. y lo resuelve con GLPK.")
-parser.add_argument("infile", help="Fichero de entrada con los datos del problema.")
+parser.add_argument("infile", help="Fichero de entrada con los datos del problema (o directorio de una instancia binaria).")
 parser.add_argument("outfile", help="Fichero .dat de salida que se generará.")
 parser.add_argument("--debug", action="store_true", help="Activa el modo de depuración para mostrar más información.")
+parser.add_argument("--engine", choices=["glpsol", "libglpk"], default="glpsol", help="Resolver con glpsol o con libglpk en proceso (sin generar el .dat).")
+parser.add_argument("--window", type=int, default=None, help="Resuelve por horizonte rodante con ventanas de este número de franjas.")
+parser.add_argument("--overlap", type=int, default=0, help="Franjas de solape entre ventanas consecutivas (solo con --window).")
 args = parser.parse_args()
 
 infile = args.infile
@@ -16,177 +26,293 @@ outfile = args.outfile
 def debug_print(*message):
     if args.debug:
         print(*message)
-try:
-    # Read data from infile
-    with open(infile, 'r') as f:
-        lines = [line.strip() for line in f if line.strip()]
-    
-    # Case: incomplete file
-    if len(lines) < 4:
-        print(f"Error: El fichero de entrada '{infile}' está incompleto. Se esperan al menos 4 líneas.")
+
+
+if formato_binario.is_binary(infile):
+    # Binary instance: d and p are memory-mapped, nothing is parsed or copied
+    arrays = formato_binario.load(infile)
+    missing = [name for name in ("n", "kd", "kp", "d", "p") if name not in arrays]
+    if missing:
+        print(f"Error: A la instancia binaria '{infile}' le faltan los parámetros {', '.join(missing)}.")
         sys.exit(1)
-    
-    # Case: extra lines in file
-    if len(lines) > 4:
-        print(f"Error: El fichero de entrada '{infile}' contiene {len(lines) - 4} líneas extra. Se esperan exactamente 4 líneas.")
+    n, kd, kp = int(arrays["n"]), float(arrays["kd"]), float(arrays["kp"])
+    d, p = arrays["d"], arrays["p"]
+    m = len(d)
+
+    try:
+        formato_binario.check_p21(n, d, p)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if kd < 0 or kp < 0:
+        print(f"Error: Las constantes kd ({kd}) y kp ({kp}) no pueden ser negativas.")
         sys.exit(1)
 
-    # Parse data
+else:
     try:
-        n, m = map(int, re.findall(r"[0-9.]+", lines[0]))
-        kd, kp = map(float, re.findall(r"[0-9.]+", lines[1]))
-        d = list(map(float, re.findall(r"[0-9.]+", lines[2])))
-        p = list(map(float, re.findall(r"[0-9.]+", lines[3])))
-
-        # --- Additional data validations ---
-        if n < 0:
-            print(f"Error: El número de franjas ({n}) no puede ser negativo.")
-            sys.exit(1)
-        if m < 0:
-            print(f"Error: El número de autobuses ({m}) no puede ser negativo.")
-            sys.exit(1)
-        
-        if kd < 0:
-            print(f"Error: La constante kd ({kd}) no puede ser negativa.")
+        # Read data from infile
+        with open(infile, 'r') as f:
+            lines = [line.strip() for line in f if line.strip()]
+    
+        # Case: incomplete file
+        if len(lines) < 4:
+            print(f"Error: El fichero de entrada '{infile}' está incompleto. Se esperan al menos 4 líneas.")
             sys.exit(1)
-        if kp < 0:
-            print(f"Error: La constante kp ({kp}) no puede ser negativa.")
+    
+        # Case: extra lines in file
+        if len(lines) > 4:
+            print(f"Error: El fichero de entrada '{infile}' contiene {len(lines) - 4} líneas extra. Se esperan exactamente 4 líneas.")
             sys.exit(1)
 
-        if len(d) != m:
-            print(f"Error: El número de valores 'd' ({len(d)}) no coincide con el número de autobuses ({m}).")
-            sys.exit(1)
+        # Parse data
+        try:
+            n, m = map(int, re.findall(r"[0-9.]+", lines[0]))
+            kd, kp = map(float, re.findall(r"[0-9.]+", lines[1]))
+            d = list(map(float, re.findall(r"[0-9.]+", lines[2])))
+            p = list(map(float, re.findall(r"[0-9.]+", lines[3])))
 
-        if len(p) != m:
-            print(f"Error: El número de valores 'p' ({len(p)}) no coincide con el número de autobuses ({m}).")
-            sys.exit(1)
+            # --- Additional data validations ---
+            if n < 0:
+                print(f"Error: El número de franjas ({n}) no puede ser negativo.")
+                sys.exit(1)
+            if m < 0:
+                print(f"Error: El número de autobuses ({m}) no puede ser negativo.")
+                sys.exit(1)
         
-        for i, val in enumerate(d):
-            if val < 0:
-                print(f"Error: El valor d en la posición {i} ({val}) no puede ser negativo.")
+            if kd < 0:
+                print(f"Error: La constante kd ({kd}) no puede ser negativa.")
                 sys.exit(1)
-            if val != int(val):
-                print(f"Error: El valor d en la posición {i} ({val}) debe ser un número entero.")
+            if kp < 0:
+                print(f"Error: La constante kp ({kp}) no puede ser negativa.")
                 sys.exit(1)
 
-        for i, val in enumerate(p):
-            if val < 0:
-                print(f"Error: El valor p en la posición {i} ({val}) no puede ser negativo.")
+            if len(d) != m:
+                print(f"Error: El número de valores 'd' ({len(d)}) no coincide con el número de autobuses ({m}).")
                 sys.exit(1)
-            if val != int(val):
-                print(f"Error: El valor p en la posición {i} ({val}) debe ser un número entero.")
+
+            if len(p) != m:
+                print(f"Error: El número de valores 'p' ({len(p)}) no coincide con el número de autobuses ({m}).")
                 sys.exit(1)
+        
+            for i, val in enumerate(d):
+                if val < 0:
+                    print(f"Error: El valor d en la posición {i} ({val}) no puede ser negativo.")
+                    sys.exit(1)
+                if val != int(val):
+                    print(f"Error: El valor d en la posición {i} ({val}) debe ser un número entero.")
+                    sys.exit(1)
+
+            for i, val in enumerate(p):
+                if val < 0:
+                    print(f"Error: El valor p en la posición {i} ({val}) no puede ser negativo.")
+                    sys.exit(1)
+                if val != int(val):
+                    print(f"Error: El valor p en la posición {i} ({val}) debe ser un número entero.")
+                    sys.exit(1)
+
+        # Error handling
+        except (ValueError, IndexError):
+            print(f"Error: Formato de datos incorrecto en el fichero de entrada '{infile}'.")
+            sys.exit(1)
 
-    # Error handling
-    except (ValueError, IndexError):
-        print(f"Error: Formato de datos incorrecto en el fichero de entrada '{infile}'.")
+    # Case: file not found
+    except FileNotFoundError:
+        print(f"Error: El fichero de entrada '{infile}' no existe.")
+        sys.exit(1)
+    except IOError as e:
+        print(f"Error: No se pudo leer el fichero de entrada '{infile}': {e}")
         sys.exit(1)
 
-# Case: file not found
-except FileNotFoundError:
-    print(f"Error: El fichero de entrada '{infile}' no existe.")
-    sys.exit(1)
-except IOError as e:
-    print(f"Error: No se pudo leer el fichero de entrada '{infile}': {e}")
-    sys.exit(1)
-
-try:
-    # Generate .dat
-    with open(outfile, 'w') as f:
-        # add sets
-        f.write(f"set AUTOBUSES := {' '.join([f'a{i+1}' for i in range(m)])};\n")
-        f.write(f"set FRANJAS := {' '.join([f'f{j+1}' for j in range(n)])};\n\n")
-        
-        # add kd and kp constants
-        f.write(f"param kd := {kd};\n")
-        f.write(f"param kp := {kp};\n\n")
-
-        # add d[i]
-        f.write("param d :=\n")
-        for i in range(m):
-            f.write(f" a{i+1} {d[i]}\n")
-        
-        # add p[i]
-        f.write(";\n\nparam p :=\n")
-        for i in range(m):
-            f.write(f" a{i+1} {p[i]}\n")
-        f.write(";\n")
-except IOError as e:
-    print(f"Error: No se pudo escribir en el fichero de salida '{outfile}': {e}")
-    sys.exit(1)
-
-debug_print(f"Fichero de datos '{outfile}' generado correctamente.")
-debug_print("Ejecutando glpsol...")
-
-# Solve with GLPK, capturing output to hide it from the terminal
-try:
-    result = subprocess.run(
-        ["glpsol", "--model", "parte-2-1.mod", "--data", outfile, "--output", "output.out"],
-        capture_output=True,
-        text=True,
-        check=False  # We will check the output manually
-    )
-except FileNotFoundError:
-    print("\nError: El comando 'glpsol' no se encontró.")
-    print("Comprueba que GLPK está instalado y que 'glpsol' está en el PATH del sistema.")
-    sys.exit(1)
-except subprocess.CalledProcessError as e:
-    print(f"\nError: 'glpsol' terminó con un código de error ({e.returncode}).")
-    print("Revisa que el fichero del modelo 'parte-2-1.mod' existe y es correcto.")
-    print("Salida de error de glpsol:")
-    print(e.stderr)
-    sys.exit(1)
-
-# Check if an optimal solution was found by reading the stdout
-debug_print(result.stdout)
-if "OPTIMAL LP SOLUTION FOUND" not in result.stdout:
-    print("\nError: No se encontró una solución óptima.", file=sys.stderr)
-    if "HAS NO PRIMAL FEASIBLE SOLUTION" in result.stdout:
-        print("Razón: El problema no tiene una solución factible (es infactible).", file=sys.stderr)
-    elif "HAS NO DUAL FEASIBLE SOLUTION" in result.stdout:
-        print("Razón: El problema es no acotado.", file=sys.stderr)
-    # Exit with an error code so that random-cases-1.py can catch it
-    sys.exit(1)
-
-
-# Parse result and print it
-objective_value = None
-variables_count = None
-constraints_count = None
-assignments = {}
-try:
-    # Parse the result
-    with open("output.out", "r") as f:
-        content = f.read()
-        
-        # Objective value
-        obj_match = re.search(r"Objective:\s+\w+\s+=\s+([0-9eE.+-]+)", content)
-        if obj_match:
-            objective_value = float(obj_match.group(1))
-        
-        # Number of constraints and variables
-        rows_match = re.search(r"Rows:\s+(\d+)", content)
-        if rows_match:
-            constraints_count = int(rows_match.group(1))
-        cols_match = re.search(r"Columns:\s+(\d+)", content)
-        if cols_match:
-            variables_count = int(cols_match.group(1))
-        
-        # Variable assignments
-        # ej: 1 x[a1,f1] * 1 0 1
-        for match in re.finditer(r"x\[(a\d+),(f\d+)\]\s+\*\s+1", content):
-            bus, franja = match.groups()
-            assignments[bus] = franja
-except FileNotFoundError:
-    print("Error: El fichero de resultados 'output.out' no fue generado por glpsol.")
-    sys.exit(1)
+def write_dat(path, buses, slots):
+    """Escribe el fichero .dat para los autobuses (índices) y franjas (índices) dados."""
+    buses = list(buses)
+    # Slice d and p once: indexing a memory-mapped array element by element creates a view per read
+    d_values = np.asarray(d, dtype=float)[buses].tolist()
+    p_values = np.asarray(p, dtype=float)[buses].tolist()
+    try:
+        with open(path, 'w') as f:
+            # add sets
+            f.write(f"set AUTOBUSES := {' '.join([f'a{i+1}' for i in buses])};\n")
+            f.write(f"set FRANJAS := {' '.join([f'f{j+1}' for j in slots])};\n\n")
+
+            # add kd and kp constants
+            f.write(f"param kd := {kd};\n")
+            f.write(f"param kp := {kp};\n\n")
+
+            # add d[i]
+            f.write("param d :=\n")
+            for i, value in zip(buses, d_values):
+                f.write(f" a{i+1} {value}\n")
+
+            # add p[i]
+            f.write(";\n\nparam p :=\n")
+            for i, value in zip(buses, p_values):
+                f.write(f" a{i+1} {value}\n")
+            f.write(";\n")
+    except IOError as e:
+        print(f"Error: No se pudo escribir en el fichero de salida '{path}': {e}")
+        sys.exit(1)
+
+
+def solve_glpsol(dat_path):
+    """Resuelve parte-2-1.mod con los datos dados y devuelve (objetivo, variables, restricciones, asignaciones)."""
+    # Solve with GLPK, capturing output to hide it from the terminal
+    try:
+        result = subprocess.run(
+            ["glpsol", "--model", "parte-2-1.mod", "--data", dat_path, "--output", "output.out"],
+            capture_output=True,
+            text=True,
+            check=False  # We will check the output manually
+        )
+    except FileNotFoundError:
+        print("\nError: El comando 'glpsol' no se encontró.")
+        print("Comprueba que GLPK está instalado y que 'glpsol' está en el PATH del sistema.")
+        sys.exit(1)
+    except subprocess.CalledProcessError as e:
+        print(f"\nError: 'glpsol' terminó con un código de error ({e.returncode}).")
+        print("Revisa que el fichero del modelo 'parte-2-1.mod' existe y es correcto.")
+        print("Salida de error de glpsol:")
+        print(e.stderr)
+        sys.exit(1)
+
+    # Check if an optimal solution was found by reading the stdout
+    debug_print(result.stdout)
+    if "OPTIMAL LP SOLUTION FOUND" not in result.stdout:
+        print("\nError: No se encontró una solución óptima.", file=sys.stderr)
+        if "HAS NO PRIMAL FEASIBLE SOLUTION" in result.stdout:
+            print("Razón: El problema no tiene una solución factible (es infactible).", file=sys.stderr)
+        elif "HAS NO DUAL FEASIBLE SOLUTION" in result.stdout:
+            print("Razón: El problema es no acotado.", file=sys.stderr)
+        # Exit with an error code so that random-cases-1.py can catch it
+        sys.exit(1)
+
+    # Parse result
+    objective_value = None
+    variables_count = None
+    constraints_count = None
+    assignments = {}
+    try:
+        with open("output.out", "r") as f:
+            content = f.read()
+
+            # Objective value
+            obj_match = re.search(r"Objective:\s+\w+\s+=\s+([0-9eE.+-]+)", content)
+            if obj_match:
+                objective_value = float(obj_match.group(1))
+
+            # Number of constraints and variables
+            rows_match = re.search(r"Rows:\s+(\d+)", content)
+            if rows_match:
+                constraints_count = int(rows_match.group(1))
+            cols_match = re.search(r"Columns:\s+(\d+)", content)
+            if cols_match:
+                variables_count = int(cols_match.group(1))
+
+            # Variable assignments
+            # ej: 1 x[a1,f1] * 1 0 1
+            for match in re.finditer(r"x\[(a\d+),(f\d+)\]\s+\*\s+1", content):
+                bus, franja = match.groups()
+                assignments[bus] = franja
+    except FileNotFoundError:
+        print("Error: El fichero de resultados 'output.out' no fue generado por glpsol.")
+        sys.exit(1)
+
+    return objective_value, variables_count, constraints_count, assignments
+
+
+# libglpk problems by (buses, slots), reused across solves of the same shape
+libglpk_models = {}
+
+
+def solve_libglpk(buses, slots):
+    """
+    Resuelve en proceso con libglpk. El problema tiene solo los autobuses y
+    franjas dados, y se reutiliza para cualquier llamada con el mismo número de ambos.
+    """
+    buses, slots = list(buses), list(slots)
+    try:
+        shape = (len(buses), len(slots))
+        model = libglpk_models.get(shape)
+        if model is None:
+            model = libglpk_models[shape] = glpk_lib.ModeloParte21(*shape)
+        model.set_data(kd, kp, np.asarray(d)[buses], np.asarray(p)[buses])
+        objective_value, x = model.solve()
+    except glpk_lib.GlpkError as e:
+        print(f"\nError: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    assignments = {f"a{buses[i]+1}": f"f{slots[j]+1}" for i, j in x.items()}
+    variables_count, constraints_count = model.size
+    return objective_value, variables_count, constraints_count, assignments
+
+
+def solve(buses, slots):
+    """Resuelve el modelo para los autobuses y franjas dados con el motor elegido."""
+    if args.engine == "libglpk":
+        return solve_libglpk(buses, slots)
+    write_dat(outfile, buses, slots)
+    debug_print(f"Fichero de datos '{outfile}' generado correctamente.")
+    debug_print("Ejecutando glpsol...")
+    return solve_glpsol(outfile)
+
+
+def solve_rolling(window, overlap):
+    """
+    Horizonte rodante: resuelve ventanas de `window` franjas, fija las decisiones
+    de las primeras `window - overlap` franjas y desplaza la ventana.
+    """
+    step = window - overlap
+    remaining = list(range(m))
+    assignments = {}
+    windows = []
+
+    start = 0
+    while start < n and remaining:
+        slots = list(range(start, min(start + window, n)))
+        # The last window commits every slot it contains
+        last = start + window >= n
+        committed = {f"f{j+1}" for j in (slots if last else slots[:step])}
+
+        t0 = time.perf_counter()
+        _, cols, rows, window_assignments = solve(remaining, slots)
+        elapsed = time.perf_counter() - t0
+
+        fixed = {bus: franja for bus, franja in window_assignments.items() if franja in committed}
+        assignments.update(fixed)
+        remaining = [i for i in remaining if f"a{i+1}" not in fixed]
+        windows.append((slots[0], slots[-1], elapsed, cols, rows, len(fixed)))
+        if last:
+            break
+        start += step
+
+    # Total objective over the whole horizon: assigned buses pay kd*d, the rest kp*p
+    assigned = {int(bus[1:]) - 1 for bus in assignments}
+    objective_value = sum(kd * d[i] if i in assigned else kp * p[i] for i in range(m))
+    return objective_value, windows, assignments
+
+
+if args.window is not None:
+    if args.window < 1 or not 0 <= args.overlap < args.window:
+        print("Error: Se requiere --window >= 1 y 0 <= --overlap < --window.")
+        sys.exit(1)
+
+    objective_value, windows, assignments = solve_rolling(args.window, args.overlap)
+
+    debug_print("="*25, "RESULTADOS", "="*25, "\n")
+    for k, (first, last, elapsed, cols, rows, fixed) in enumerate(windows, start=1):
+        print(f"Ventana {k}: franjas f{first+1}-f{last+1}, Tiempo: {elapsed:.4f}s, "
+              f"Variables: {cols}, Restricciones: {rows}, Asignaciones fijadas: {fixed}")
+    total_time = sum(w[2] for w in windows)
+    print(f"Coste total: {objective_value}, Ventanas: {len(windows)}, Tiempo total: {total_time:.4f}s")
+else:
+    objective_value, variables_count, constraints_count, assignments = solve(range(m), range(n))
 
-debug_print("Ejecución de glpsol finalizada.\n")
+    debug_print(f"Ejecución de {args.engine} finalizada.\n")
 
-# Print the results
-debug_print("="*25, "RESULTADOS", "="*25, "\n")
+    # Print the results
+    debug_print("="*25, "RESULTADOS", "="*25, "\n")
 
-print(f"Coste total: {objective_value}, Variables: {variables_count}, Restricciones: {constraints_count}")
+    print(f"Coste total: {objective_value}, Variables: {variables_count}, Restricciones: {constraints_count}")
 
 # Bus assignments calculations
 all_buses = {f'a{i+1}' for i in range(m)}
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+import sys
+import re
+import csv
+import heapq
+import argparse
+import os
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import formato_binario
+
+parser = argparse.ArgumentParser(description="Barrido paramétrico de (kd, kp) para el problema 2.2.1. sin llamar a GLPK.")
+parser.add_argument("infile", help="Fichero de entrada con los datos del problema o directorio de una instancia binaria (se ignoran su kd y kp).")
+parser.add_argument("--kd", type=float, nargs="+", required=True, help="Valores de kd del barrido.")
+parser.add_argument("--kp", type=float, nargs="+", required=True, help="Valores de kp del barrido.")
+parser.add_argument("--csv", default=None, help="Fichero CSV donde guardar la tabla (por defecto se imprime).")
+args = parser.parse_args()
+
+infile = args.infile
+
+
+def read_instance(path):
+    """Lee n, d y p de un fichero .in con el formato de gen-1.py o de una instancia binaria."""
+    if formato_binario.is_binary(path):
+        arrays = formato_binario.load(path)
+        missing = [name for name in ("n", "d", "p") if name not in arrays]
+        if missing:
+            print(f"Error: A la instancia binaria '{path}' le faltan los parámetros {', '.join(missing)}.")
+            sys.exit(1)
+        n, d, p = int(arrays["n"]), arrays["d"], arrays["p"]
+    else:
+        n, d, p = read_text_instance(path)
+
+    try:
+        formato_binario.check_p21(n, d, p)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    return n, d, p
+
+
+def read_text_instance(path):
+    """Lee n, d y p de un fichero .in con el formato de gen-1.py."""
+    try:
+        with open(path, 'r') as f:
+            lines = [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        print(f"Error: El fichero de entrada '{path}' no existe.")
+        sys.exit(1)
+
+    if len(lines) != 4:
+        print(f"Error: El fichero de entrada '{path}' debe tener exactamente 4 líneas.")
+        sys.exit(1)
+
+    try:
+        n, m = map(int, re.findall(r"[0-9.]+", lines[0]))
+        d = np.array(re.findall(r"[0-9.]+", lines[2]), dtype=float)
+        p = np.array(re.findall(r"[0-9.]+", lines[3]), dtype=float)
+    except ValueError:
+        print(f"Error: Formato de datos incorrecto en el fichero de entrada '{path}'.")
+        sys.exit(1)
+
+    if len(d) != m or len(p) != m:
+        print(f"Error: Se esperan {m} valores de 'd' y de 'p'.")
+        sys.exit(1)
+    return n, d, p
+
+
+def assignment_masks(n, d, p, kd, kp):
+    """
+    Autobuses asignados en el óptimo para cada punto (kd[g], kp[g]).
+
+    Franjas y autobuses son intercambiables en parte-2-1.mod, así que el óptimo
+    asigna los min(n, #positivos) autobuses con mayor ahorro kp*p - kd*d > 0.
+    Devuelve una matriz booleana de forma (len(kd), m).
+    """
+    savings = kp[:, None] * p[None, :] - kd[:, None] * d[None, :]
+    masks = savings > 0
+    if n < len(d):
+        # Keep only the n largest savings of each row
+        order = np.argsort(-savings, axis=1, kind="stable")
+        top = np.zeros_like(masks)
+        np.put_along_axis(top, order[:, :n], True, axis=1)
+        masks &= top
+    return masks
+
+
+def sweep(n, d, p, kd, kp):
+    """Coste óptimo y número de autobuses asignados para cada punto del barrido."""
+    masks = assignment_masks(n, d, p, kd, kp)
+    cost = kd * (masks * d).sum(axis=1) + kp * (~masks * p).sum(axis=1)
+    return cost, masks.sum(axis=1), masks
+
+
+def breakpoints(n, d, p, lo, hi):
+    """
+    Valores del cociente r = kp/kd en (lo, hi) donde cambia la asignación óptima.
+
+    El ahorro kp*p - kd*d = kd*(r*p - d) es una recta en r para cada autobús. Se
+    barre r desde lo manteniendo las rectas ordenadas, junto con la recta 0 que
+    separa los ahorros positivos: cada cruce de dos vecinas es un evento que las
+    intercambia, y la asignación (las min(n, posición del 0) primeras) solo
+    cambia cuando el intercambio toca esa frontera. Memoria O(m).
+    """
+    m = len(d)
+    if not lo < hi:
+        return []
+    zero = m  # Index of the savings = 0 line
+    slope = np.append(np.asarray(p, dtype=float), 0.0).tolist()
+    icpt = np.append(-np.asarray(d, dtype=float), 0.0).tolist()
+
+    # Order just above lo: larger savings first, ties by larger slope, the 0 line above its ties
+    order = sorted(range(m + 1), key=lambda i: (-(lo * slope[i] + icpt[i]), -slope[i], i != zero, i))
+    pos = [0] * (m + 1)
+    for k, i in enumerate(order):
+        pos[i] = k
+
+    def assigned(i):
+        return i != zero and pos[i] < min(n, pos[zero])
+
+    events = []  # (r, k, order[k], order[k+1]): order[k+1] overtakes order[k] at r
+
+    def schedule(k, now):
+        if 0 <= k < m:
+            a, b = order[k], order[k + 1]
+            if slope[b] > slope[a]:
+                r = (icpt[a] - icpt[b]) / (slope[b] - slope[a])
+                if r < hi:
+                    heapq.heappush(events, (max(r, now), k, a, b))
+
+    for k in range(m):
+        schedule(k, lo)
+
+    result = []
+    while events:
+        r = events[0][0]
+        entered, left = set(), set()
+        # Crossings at the same r (up to rounding) form one breakpoint
+        while events and events[0][0] <= r + 1e-12 * max(1.0, abs(r)):
+            _, k, a, b = heapq.heappop(events)
+            if order[k] != a or order[k + 1] != b:
+                continue  # Stale: the pair is no longer adjacent
+            before = {a: assigned(a), b: assigned(b)}
+            order[k], order[k + 1] = b, a
+            pos[a], pos[b] = k + 1, k
+            for i, was in before.items():
+                now = assigned(i)
+                if now and not was:
+                    (left.remove(i) if i in left else entered.add(i))
+                elif was and not now:
+                    (entered.remove(i) if i in entered else left.add(i))
+            schedule(k - 1, r)
+            schedule(k + 1, r)
+
+        if entered or left:
+            result.append((r, np.array(sorted(entered), dtype=int), np.array(sorted(left), dtype=int)))
+        if len(events) > 4 * (m + 1):
+            # Drop stale events so the heap stays O(m)
+            events = [e for e in events if order[e[1]] == e[2] and order[e[1] + 1] == e[3]]
+            heapq.heapify(events)
+    return result
+
+
+n, d, p = read_instance(infile)
+kd_grid, kp_grid = (g.ravel() for g in np.meshgrid(np.array(args.kd), np.array(args.kp), indexing="ij"))
+if np.any(kd_grid < 0) or np.any(kp_grid < 0):
+    print("Error: Las constantes kd y kp no pueden ser negativas.")
+    sys.exit(1)
+
+cost, assigned, _ = sweep(n, d, p, kd_grid, kp_grid)
+
+# Print or store the table
+rows = [(kd, kp, c, a) for kd, kp, c, a in zip(kd_grid, kp_grid, cost, assigned)]
+if args.csv:
+    with open(args.csv, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["kd", "kp", "cost", "assigned_buses"])
+        writer.writerows(rows)
+    print(f"Tabla con {len(rows)} puntos guardada en '{args.csv}'.")
+else:
+    print(f"{'kd':>10} {'kp':>10} {'Coste':>14} {'Asignados':>10}")
+    for kd, kp, c, a in rows:
+        print(f"{kd:>10g} {kp:>10g} {c:>14g} {a:>10d}")
+
+# Breakpoints of the ratio kp/kd inside the swept range
+with np.errstate(divide="ignore", invalid="ignore"):
+    ratios = np.where(kd_grid > 0, kp_grid / kd_grid, np.inf)
+lo, hi = ratios.min(), ratios.max()
+print(f"\nPuntos de cambio de la asignación para kp/kd en [{lo:g}, {hi:g}]:")
+points = breakpoints(n, d, p, lo, hi)
+if not points:
+    print("Ninguno: la asignación óptima es la misma en todo el barrido.")
+for r, enter, leave in points:
+    enter = " ".join(f"a{i+1}" for i in enter) or "-"
+    leave = " ".join(f"a{i+1}" for i in leave) or "-"
+    print(f"kp/kd = {r:g}: entran {enter}, salen {leave}")
@@ -2,12 +2,28 @@
 import sys
 import subprocess
 import re
+import os
+import time
+import threading
 import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import formato_binario
+import glpk_lib
+from tamano_modelo import model_size
 
 parser = argparse.ArgumentParser(description="Genera un fichero .dat para el problema 2.2.2. y lo resuelve con GLPK.")
-parser.add_argument("infile", help="Fichero de entrada con los datos del problema.")
+parser.add_argument("infile", help="Fichero de entrada con los datos del problema (o directorio de una instancia binaria).")
 parser.add_argument("outfile", help="Fichero .dat de salida que se generará.")
 parser.add_argument("--debug", action="store_true", help="Activa el modo de depuración para mostrar más información.")
+parser.add_argument("--glpk-output", default="output2.out", help="Fichero donde glpsol escribe la solución.")
+parser.add_argument("--engine", choices=["glpsol", "libglpk"], default="glpsol", help="Resolver con glpsol o con libglpk en proceso (sin generar el .dat).")
+parser.add_argument("--formulation", choices=["basica", "reforzada"], default="basica", help="Modelo a resolver: parte-2-2.mod (basica) o parte-2-2-reforzado.mod (reforzada).")
+parser.add_argument("--portfolio", action="store_true", help="Lanza en paralelo varias estrategias (glpsol con distintas opciones y una heurística) y se queda con la primera óptima.")
+parser.add_argument("--deadline", type=float, default=60, help="Tiempo límite en segundos de --portfolio; al agotarse se usa la mejor solución encontrada.")
+parser.add_argument("--window", type=int, default=None, help="Resuelve por horizonte rodante con ventanas de este número de franjas.")
+parser.add_argument("--overlap", type=int, default=0, help="Franjas de solape entre ventanas consecutivas (solo con --window).")
 args = parser.parse_args()
 
 infile = args.infile
@@ -18,175 +34,531 @@ def debug_print(*message):
         print(*message)
 
 
-# Read and validate infile
-try:
-    with open(infile, "r", encoding="utf-8") as f:
-        debug_print(f"Leyendo {infile}...")
-        lines = [l.strip() for l in f if l.strip()]
+MODELS = {"basica": "parte-2-2.mod", "reforzada": "parte-2-2-reforzado.mod"}
 
-    if len(lines) < 3:
-        print(f"Error: el fichero '{infile}' está incompleto.")
-        sys.exit(1)
+# Branch-and-bound nodes of the last glpsol run (None if unknown)
+last_nodes = None
 
-    # First line: n: Buses, m: Time slots, u: Workshops
+
+if formato_binario.is_binary(infile):
+    # Binary instance: C and O are memory-mapped, nothing is parsed or copied
+    debug_print(f"Leyendo {infile} (binario)...")
+    arrays = formato_binario.load(infile)
+    if "C" not in arrays or "O" not in arrays:
+        print(f"Error: la instancia binaria '{infile}' debe contener C.npy y O.npy.")
+        sys.exit(1)
+    C, O = arrays["C"], arrays["O"]
     try:
-        n, m, u = map(int, re.findall(r"[0-9.]+", lines[0]))
-    except ValueError:
-        print("Error: Los parámetros de la primera línea deben ser números enteros.")
+        formato_binario.check_p22(C, O)
+    except ValueError as e:
+        print(f"Error: {e}")
         sys.exit(1)
+    m = C.shape[0]
+    n, u = O.shape
 
-    if n < 0 or m < 0 or u < 0:
-        print("Error: Los parámetros no pueden ser negativos.")
-        sys.exit(1)
+else:
+    # Read and validate infile
+    try:
+        with open(infile, "r", encoding="utf-8") as f:
+            debug_print(f"Leyendo {infile}...")
+            lines = [l.strip() for l in f if l.strip()]
 
-    # C matrix (m x m)
-    C = []
-    idx = 1
-    for i in range(m):
-        try:
-            row = list(map(float, re.findall(r"[0-9.]+", lines[idx])))
-        except ValueError:
-            print(f"Error: La fila {i+1} de C contiene elementos no numéricos.")
-            sys.exit(1)
-        if len(row) != m:
-            print(f"Error: la fila {i+1} de C no tiene {m} columnas.")
+        if len(lines) < 3:
+            print(f"Error: el fichero '{infile}' está incompleto.")
             sys.exit(1)
-        if any(v < 0 for v in row):
-            print(f"Error: La fila {i+1} de C contiene un elemento negativo.")
-            sys.exit(1)
-        C.append(row)
-        idx += 1
-
-    # Validate symmetry of C
-    for i in range(m):
-        for j in range(m):
-            if C[i][j] != C[j][i]:
-                print(f"Error: C no es simétrica en posición ({i+1},{j+1}).")
-                sys.exit(1)
 
-    # O matrix (n x u)  ← Cambio: ahora filas = n, columnas = u
-    O = []
-    for i in range(n):
+        # First line: n: Buses, m: Time slots, u: Workshops
         try:
-            row = list(map(int, re.findall(r"[0-9.]+", lines[idx])))
+            n, m, u = map(int, re.findall(r"[0-9.]+", lines[0]))
         except ValueError:
-            print(f"Error: la fila {i+1} de O contiene elementos no enteros.")
+            print("Error: Los parámetros de la primera línea deben ser números enteros.")
             sys.exit(1)
-        if len(row) != u:
-            print(f"Error: la fila {i+1} de O no tiene {u} columnas.")
+
+        if n < 0 or m < 0 or u < 0:
+            print("Error: Los parámetros no pueden ser negativos.")
             sys.exit(1)
-        if any(v not in (0,1) for v in row):
-            print("Error: la matriz O debe ser binaria (0/1).")
+
+        # C matrix (m x m)
+        C = []
+        idx = 1
+        for i in range(m):
+            try:
+                row = list(map(float, re.findall(r"[0-9.]+", lines[idx])))
+            except ValueError:
+                print(f"Error: La fila {i+1} de C contiene elementos no numéricos.")
+                sys.exit(1)
+            if len(row) != m:
+                print(f"Error: la fila {i+1} de C no tiene {m} columnas.")
+                sys.exit(1)
+            if any(v < 0 for v in row):
+                print(f"Error: La fila {i+1} de C contiene un elemento negativo.")
+                sys.exit(1)
+            C.append(row)
+            idx += 1
+
+        # Validate symmetry of C
+        for i in range(m):
+            for j in range(m):
+                if C[i][j] != C[j][i]:
+                    print(f"Error: C no es simétrica en posición ({i+1},{j+1}).")
+                    sys.exit(1)
+
+        # O matrix (n x u)  ← Cambio: ahora filas = n, columnas = u
+        O = []
+        for i in range(n):
+            try:
+                row = list(map(int, re.findall(r"[0-9.]+", lines[idx])))
+            except ValueError:
+                print(f"Error: la fila {i+1} de O contiene elementos no enteros.")
+                sys.exit(1)
+            if len(row) != u:
+                print(f"Error: la fila {i+1} de O no tiene {u} columnas.")
+                sys.exit(1)
+            if any(v not in (0,1) for v in row):
+                print("Error: la matriz O debe ser binaria (0/1).")
+                sys.exit(1)
+            O.append(row)
+            idx += 1
+
+        # Validate for extra lines in the input file
+        if idx < len(lines):
+            print(f"Error: El fichero de entrada '{infile}' contiene {len(lines)-idx} líneas extra después de los datos esperados.")
             sys.exit(1)
-        O.append(row)
-        idx += 1
 
-    # Validate for extra lines in the input file
-    if idx < len(lines):
-        print(f"Error: El fichero de entrada '{infile}' contiene {len(lines)-idx} líneas extra después de los datos esperados.")
+    except FileNotFoundError:
+        print(f"Error: el fichero '{infile}' no existe.")
         sys.exit(1)
 
-except FileNotFoundError:
-    print(f"Error: el fichero '{infile}' no existe.")
-    sys.exit(1)
+
+def write_dat(path, buses, slots, max_deferred=None):
+    """Escribe el fichero .dat para los autobuses (índices) y franjas (índices) dados."""
+    buses, slots = list(buses), list(slots)
+    # Slice C and O once: indexing a memory-mapped array cell by cell creates a view per read
+    c_block = np.asarray(C, dtype=float)[np.ix_(buses, buses)].tolist()
+    o_block = np.asarray(O, dtype=int).reshape(n, u)[slots].tolist()
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            # Sets
+            f.write("# --- Conjuntos ---\n")
+            f.write(f"set AUTOBUSES := {' '.join([f'A{i+1}' for i in buses])};\n")
+            f.write(f"set TALLERES := {' '.join([f'T{i+1}' for i in range(u)])};\n")
+            f.write(f"set FRANJAS := {' '.join([f'S{s+1}' for s in slots])};\n\n")
+
+            # Parameter c
+            f.write("# --- Parámetro de coincidencia de pasajeros (c[i,j]) ---\n")
+            f.write("param c:\n")
+            f.write("     " + "  ".join([f"A{i+1}" for i in buses]) + " :=\n")
+            for i, values in zip(buses, c_block):
+                row = "  ".join(str(int(v)) if v.is_integer() else str(v) for v in values)
+                f.write(f"A{i+1}  {row}\n")
+            f.write(";\n\n")
+
+            # Parameter o (transposed)
+            f.write("# --- Disponibilidad de franjas por taller (o[s,t]) ---\n")
+            f.write("param o:\n")
+            f.write("      " + "  ".join([f"T{i+1}" for i in range(u)]) + " :=\n")
+            for s, values in zip(slots, o_block):
+                row = "  ".join(str(v) for v in values)
+                f.write(f"S{s+1}   {row}\n")
+            f.write(";\n")
+
+            # Only used by the rolling-horizon window model
+            if max_deferred is not None:
+                f.write(f"\nparam max_aplazados := {max_deferred};\n")
+
+        debug_print(f"Fichero de datos '{path}' generado correctamente.")
+
+    except IOError as e:
+        print(f"Error al escribir '{path}': {e}")
+        sys.exit(1)
+
+
+def solve_glpsol(dat_path, model="parte-2-2.mod"):
+    """Resuelve el modelo con los datos dados y devuelve (objetivo, variables, restricciones, asignaciones)."""
+    # Run GLPK
+    try:
+        debug_print("Ejecutando glpsol...")
+        result = subprocess.run(
+            ["glpsol", "--model", model, "--data", dat_path, "-o", args.glpk_output],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+    except subprocess.CalledProcessError as e:
+        print(f"\nError: 'glpsol' terminó con un código de error ({e.returncode}).")
+        print(f"Revisa que el fichero del modelo '{model}' existe y es correcto.")
+        print("Salida de error de glpsol:")
+        print(e.stderr)
+        sys.exit(1)
+
+    except FileNotFoundError:
+        print("Error: 'glpsol' no se encontró. Instala GLPK o añade su ruta al PATH.")
+        sys.exit(1)
+
+    debug_print(result.stdout)
+    global last_nodes
+    last_nodes = count_nodes(result.stdout)
+    # Check if an optimal solution was found
+    if "OPTIMAL SOLUTION FOUND" not in result.stdout:
+        print("Error: No se encontró una solución óptima.", file=sys.stderr)
+        if "HAS NO PRIMAL FEASIBLE SOLUTION" in result.stdout:
+            print("Razón: El problema no tiene una solución factible (es infactible).", file=sys.stderr)
+        elif "HAS NO DUAL FEASIBLE SOLUTION" in result.stdout:
+            print("Razón: El problema es no acotado.", file=sys.stderr)
+        sys.exit(1)
+
+    return parse_glpsol_output(args.glpk_output)
+
+
+def count_nodes(stdout):
+    """Nodos de branch-and-bound según la última línea de progreso de glpsol: '... (activos; resueltos)'."""
+    progress = re.findall(r"\((\d+); (\d+)\)", stdout)
+    if not progress:
+        return None
+    active, done = progress[-1]
+    return int(active) + int(done)
 
 
-# Generate .dat file
-try:
-    with open(outfile, "w", encoding="utf-8") as f:
-        # Sets
-        f.write("# --- Conjuntos ---\n")
-        f.write(f"set AUTOBUSES := {' '.join([f'A{i+1}' for i in range(m)])};\n")
-        f.write(f"set TALLERES := {' '.join([f'T{i+1}' for i in range(u)])};\n")
-        f.write(f"set FRANJAS := {' '.join([f'S{i+1}' for i in range(n)])};\n\n")
+def parse_glpsol_output(path):
+    """Lee de un informe de glpsol (-o) el objetivo, el tamaño del modelo y las asignaciones x = 1."""
+    objective_value = None
+    rows = cols = None
+    assignments = {}
 
-        # Parameter c
-        f.write("# --- Parámetro de coincidencia de pasajeros (c[i,j]) ---\n")
-        f.write("param c:\n")
-        f.write("     " + "  ".join([f"A{i+1}" for i in range(m)]) + " :=\n")
+    with open(path, "r", encoding="utf-8") as f:
+        out = f.read()
+
+    mobj = re.search(r"Objective:\s+\w+\s+=\s+([0-9eE.+-]+)", out)
+    if mobj:
+        objective_value = float(mobj.group(1))
+
+    mrows = re.search(r"Rows:\s+(\d+)", out)
+    mcols = re.search(r"Columns:\s+(\d+)", out)
+    if mrows:
+        rows = int(mrows.group(1))
+    if mcols:
+        cols = int(mcols.group(1))
+
+    pattern = re.compile(r"[xX]\[(A\d+),(S\d+),(T\d+)\].*?([0-9\.\-Ee]+)")
+    for match in pattern.finditer(out):
+        a, s, t, val = match.groups()
+        try:
+            v = float(val)
+            if abs(v - 1.0) < 1e-6:
+                assignments[a] = (s, t)
+        except ValueError:
+            continue
+
+    # Strengthened formulation: w[i,s] = 1 puts bus i in slot s, in any free workshop
+    slot_buses = {}
+    for match in re.finditer(r"w\[(A\d+),(S\d+)\]\s+\*?\s*([0-9.eE+-]+)", out):
+        a, s, val = match.groups()
+        if abs(float(val) - 1.0) < 1e-6:
+            slot_buses.setdefault(s, []).append(a)
+    for s, buses in slot_buses.items():
+        workshops = [f"T{t+1}" for t in range(u) if O[int(s[1:]) - 1][t] == 1]
+        for a, t in zip(sorted(buses, key=lambda a: int(a[1:])), workshops):
+            assignments[a] = (s, t)
+
+    return objective_value, cols, rows, assignments
+
+
+# glpsol strategies raced by --portfolio (name -> extra glpsol options)
+PORTFOLIO = {
+    "mip": [],
+    "cuts": ["--cuts"],
+    "pcost": ["--pcost"],
+    "dfs": ["--dfs"],
+}
+
+
+def solve_heuristic(stop=None):
+    """
+    Heurística voraz + búsqueda local: cada autobús va a la franja con hueco libre
+    que menos coincidencias añade, y después se mueve un autobús a una franja con
+    hueco o se intercambian dos autobuses de franjas distintas mientras mejore.
+    Si se activa `stop` (threading.Event), la búsqueda local para con lo que tenga.
+    Devuelve (objetivo, asignaciones) o None si no hay huecos suficientes.
+    """
+    # Only pairs i < j count, as in the model: the diagonal of C is ignored
+    Cm = np.array(C, dtype=float).reshape(m, m)
+    np.fill_diagonal(Cm, 0)
+    # int64 sums: instances saved by older versions store O as int8, which wraps at 128
+    free = np.asarray(O).reshape(n, u).sum(axis=1, dtype=np.int64)
+    if free.sum() < m:
+        return None
+
+    # added[i, s]: coincidences between bus i and the buses currently in slot s
+    added = np.zeros((m, n))
+    slot_of = np.full(m, -1)
+
+    def place(i, s):
+        if slot_of[i] >= 0:
+            added[:, slot_of[i]] -= Cm[:, i]
+            free[slot_of[i]] += 1
+        added[:, s] += Cm[:, i]
+        free[s] -= 1
+        slot_of[i] = s
+
+    for i in np.argsort(-Cm.sum(axis=1), kind="stable"):
+        s = min((s for s in range(n) if free[s] > 0), key=lambda s: (added[i, s], -free[s]))
+        place(i, s)
+
+    def stopped():
+        return stop is not None and stop.is_set()
+
+    # Local search: first improving move, then first improving swap, until neither lowers the cost
+    buses = np.arange(m)
+    improved = True
+    while improved and not stopped():
+        improved = False
         for i in range(m):
-            row = "  ".join(str(int(C[i][j])) if C[i][j].is_integer() else str(C[i][j]) for j in range(m))
-            f.write(f"A{i+1}  {row}\n")
-        f.write(";\n\n")
-
-        # Parameter o (transposed)
-        f.write("# --- Disponibilidad de franjas por taller (o[s,t]) ---\n")
-        f.write("param o:\n")
-        f.write("      " + "  ".join([f"T{i+1}" for i in range(u)]) + " :=\n")
-        for s in range(n):
-            row = "  ".join(str(O[s][t]) for t in range(u))
-            f.write(f"S{s+1}   {row}\n")
-        f.write(";\n")
-
-    debug_print(f"Fichero de datos '{outfile}' generado correctamente.")
-
-except IOError as e:
-    print(f"Error al escribir '{outfile}': {e}")
-    sys.exit(1)
+            if stopped():
+                break
+            s = slot_of[i]
+            gain = np.where(free > 0, added[i, s] - added[i], -np.inf)
+            gain[s] = -np.inf
+            s2 = int(np.argmax(gain))
+            if gain[s2] > 1e-9:
+                place(i, s2)
+                improved = True
+                continue
+
+            # Swapping i (slot s) and j (slot b) changes the cost by
+            # added[i,b] - added[i,s] + added[j,s] - added[j,b] - 2*C[i,j]
+            delta = added[i, slot_of] - added[i, s] + added[buses, s] - added[buses, slot_of] - 2 * Cm[i]
+            delta[slot_of == s] = np.inf
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-9:
+                s2 = slot_of[j]
+                place(i, s2)
+                place(j, s)
+                improved = True
+
+    members = [np.flatnonzero(slot_of == s) for s in range(n)]
+    objective_value = sum(np.triu(Cm[np.ix_(group, group)], k=1).sum() for group in members)
+    assignments = {}
+    for s, group in enumerate(members):
+        workshops = [t for t in range(u) if O[s][t] == 1]
+        for i, t in zip(group, workshops):
+            assignments[f"A{i+1}"] = (f"S{s+1}", f"T{t+1}")
+    return float(objective_value), assignments
+
+
+def solve_portfolio(deadline):
+    """
+    Lanza en paralelo glpsol con las estrategias de PORTFOLIO y la heurística.
+    Gana la primera solución probada óptima; si ninguna lo está antes de
+    `deadline` segundos, la mejor solución incumbente. Devuelve
+    (objetivo, variables, restricciones, asignaciones, estrategia, óptima).
+    """
+    write_dat(outfile, range(m), range(n))
+
+    # The deadline counts from the launch of the strategies
+    start = time.perf_counter()
+    # One core stays for this process (heuristic and polling)
+    strategies = list(PORTFOLIO.items())[:max(1, (os.cpu_count() or 2) - 1)]
+    running = {}
+    try:
+        for name, options in strategies:
+            out_path = f"{args.glpk_output}.{name}"
+            running[name] = (subprocess.Popen(
+                ["glpsol", "--model", MODELS[args.formulation], "--data", outfile, "-o", out_path,
+                 "--tmlim", str(max(1, int(deadline)))] + options,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL), out_path)
+    except FileNotFoundError:
+        print("Error: 'glpsol' no se encontró. Instala GLPK o añade su ruta al PATH.")
+        sys.exit(1)
+    debug_print(f"Estrategias lanzadas: {', '.join(running)} + heuristic")
+
+    candidates = []  # (objective, cols, rows, assignments, strategy, optimal)
+    cols, rows = model_size(O, m, args.formulation)
+
+    # The heuristic runs in a thread so glpsol results are picked up while it searches
+    stop = threading.Event()
+    heuristic = []
+    worker = threading.Thread(target=lambda: heuristic.append(solve_heuristic(stop)), daemon=True)
+    worker.start()
+
+    def collect_heuristic():
+        if heuristic and heuristic[0] is not None:
+            # Impacts are non-negative, so a zero-cost solution is optimal
+            objective_value, assignments = heuristic.pop()
+            candidates.append((objective_value, cols, rows, assignments, "heuristic", objective_value == 0))
+
+    # Poll until a strategy proves optimality, all of them finish or the deadline passes
+    while running or worker.is_alive():
+        collect_heuristic()
+        if any(c[5] for c in candidates):
+            break
+        for name, (proc, out_path) in list(running.items()):
+            if proc.poll() is None:
+                continue
+            del running[name]
+            if not os.path.exists(out_path):
+                continue
+            with open(out_path, "r", encoding="utf-8") as f:
+                status = re.search(r"Status:\s+(.+)", f.read())
+            if status and "UNDEFINED" not in status.group(1) and "EMPTY" not in status.group(1):
+                objective_value, c, r, assignments = parse_glpsol_output(out_path)
+                candidates.append((objective_value, c, r, assignments, name,
+                                   status.group(1).strip() == "INTEGER OPTIMAL"))
+            os.remove(out_path)
+        elapsed = time.perf_counter() - start
+        if elapsed > deadline:
+            stop.set()  # The heuristic returns its incumbent
+        if elapsed > deadline + 5:
+            break
+        time.sleep(0.05)
+
+    # Cleanly stop the heuristic and the strategies that are still running
+    stop.set()
+    worker.join()
+    collect_heuristic()
+    for name, (proc, out_path) in running.items():
+        proc.kill()
+        proc.wait()
+        if os.path.exists(out_path):
+            os.remove(out_path)
+
+    if not candidates:
+        print("Error: Ninguna estrategia encontró una solución factible.", file=sys.stderr)
+        sys.exit(1)
+    # Proven optimal first, then the best incumbent
+    return min(candidates, key=lambda c: (not c[5], c[0]))
 
 
-# Run GLPK
-try:
-    debug_print("Ejecutando glpsol...")
-    result = subprocess.run(
-        ["glpsol", "--model", "parte-2-2.mod", "--data", outfile, "-o", "output2.out"],
-        capture_output=True,
-        text=True,
-        check=True,
-    )
-
-except subprocess.CalledProcessError as e:
-    print(f"\nError: 'glpsol' terminó con un código de error ({e.returncode}).")
-    print("Revisa que el fichero del modelo 'parte-2-2.mod' existe y es correcto.")
-    print("Salida de error de glpsol:")
-    print(e.stderr)
-    sys.exit(1)
+# libglpk problems by (buses, slots, window model), reused across solves of the same shape
+libglpk_models = {}
 
-except FileNotFoundError:
-    print("Error: 'glpsol' no se encontró. Instala GLPK o añade su ruta al PATH.")
-    sys.exit(1)
 
+def solve_libglpk(buses, slots, max_deferred=None):
+    """
+    Resuelve en proceso con libglpk el mismo modelo que glpsol: parte-2-2.mod, o
+    parte-2-2-rh.mod si max_deferred != None. El problema tiene solo los autobuses
+    y franjas dados, y se reutiliza para cualquier llamada con la misma forma.
+    """
+    buses, slots = list(buses), list(slots)
+    try:
+        shape = (len(buses), len(slots), u, max_deferred is not None)
+        model = libglpk_models.get(shape)
+        if model is None:
+            model = libglpk_models[shape] = glpk_lib.ModeloParte22(*shape)
+        model.set_data(np.asarray(C)[np.ix_(buses, buses)], np.asarray(O).reshape(n, u)[slots], max_deferred)
+        objective_value, x = model.solve()
+    except glpk_lib.GlpkError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
-# Read result (Checking assignation detection)
-objective_value = None
-rows = cols = None
-assignments = {}
-
-with open("output2.out", "r", encoding="utf-8") as f:
-    out = f.read()
-debug_print(result.stdout)
-# Check if an optimal solution was found
-if "OPTIMAL SOLUTION FOUND" not in result.stdout:
-    print("Error: No se encontró una solución óptima.", file=sys.stderr)
-    if "HAS NO PRIMAL FEASIBLE SOLUTION" in result.stdout:
-        print("Razón: El problema no tiene una solución factible (es infactible).", file=sys.stderr)
-    elif "HAS NO DUAL FEASIBLE SOLUTION" in result.stdout:
-        print("Razón: El problema es no acotado.", file=sys.stderr)
+    assignments = {f"A{buses[i]+1}": (f"S{slots[s]+1}", f"T{t+1}") for i, (s, t) in x.items()}
+    cols, rows = model.size
+    return objective_value, cols, rows, assignments
+
+
+def solve(buses, slots, max_deferred=None):
+    """Resuelve con el motor elegido; max_deferred != None usa el modelo de ventana (parte-2-2-rh.mod)."""
+    if args.engine == "libglpk":
+        return solve_libglpk(buses, slots, max_deferred)
+    write_dat(outfile, buses, slots, max_deferred)
+    return solve_glpsol(outfile, MODELS[args.formulation] if max_deferred is None else "parte-2-2-rh.mod")
+
+
+def solve_rolling(window, overlap):
+    """
+    Horizonte rodante: resuelve ventanas de `window` franjas con parte-2-2-rh.mod,
+    fija las asignaciones de las primeras `window - overlap` franjas y desplaza la ventana.
+    """
+    step = window - overlap
+    capacity = np.asarray(O).reshape(n, u).sum(axis=1, dtype=np.int64).tolist()
+    remaining = list(range(m))
+    assignments = {}
+    windows = []
+
+    start = 0
+    while start < n and remaining:
+        slots = list(range(start, min(start + window, n)))
+        last = start + window >= n
+        committed = {f"S{s+1}" for s in (slots if last else slots[:step])}
+
+        # Buses may be left for later windows, up to the share of usable slots that
+        # lie after the window (so the load stays spread over the horizon), but
+        # never so few that the window overflows or so many that later ones do.
+        cap_window = sum(capacity[s] for s in slots)
+        cap_after = sum(capacity[slots[-1] + 1:])
+        if cap_window + cap_after < len(remaining):
+            print("Error: No hay huecos suficientes para asignar todos los autobuses.", file=sys.stderr)
+            sys.exit(1)
+        open_window = sum(1 for s in slots if capacity[s] > 0)
+        open_after = sum(1 for c in capacity[slots[-1] + 1:] if c > 0)
+        share = -(-len(remaining) * open_after // max(open_window + open_after, 1))
+        max_deferred = min(cap_after, max(len(remaining) - cap_window, share))
+
+        t0 = time.perf_counter()
+        _, cols, rows, window_assignments = solve(remaining, slots, max_deferred)
+        elapsed = time.perf_counter() - t0
+
+        fixed = {a: st for a, st in window_assignments.items() if st[0] in committed}
+        assignments.update(fixed)
+        remaining = [i for i in remaining if f"A{i+1}" not in fixed]
+        windows.append((slots[0], slots[-1], elapsed, cols, rows, len(fixed)))
+        if last:
+            break
+        start += step
+
+    # Total impact over the whole horizon: pairs of buses sharing a slot
+    objective_value = 0.0
+    assigned = sorted(assignments, key=lambda a: int(a[1:]))
+    for k, a in enumerate(assigned):
+        for b in assigned[k + 1:]:
+            if assignments[a][0] == assignments[b][0]:
+                objective_value += C[int(a[1:]) - 1][int(b[1:]) - 1]
+    return objective_value, windows, assignments
+
+
+if args.formulation == "reforzada" and (args.window is not None or args.engine == "libglpk"):
+    print("Error: la formulación reforzada solo está disponible con glpsol y sin --window.")
     sys.exit(1)
 
-mobj = re.search(r"Objective:\s+\w+\s+=\s+([0-9eE.+-]+)", out)
-if mobj:
-    objective_value = float(mobj.group(1))
+if args.portfolio:
+    if args.window is not None:
+        print("Error: --portfolio no se puede combinar con --window.")
+        sys.exit(1)
+    if args.engine == "libglpk":
+        print("Error: --portfolio lanza glpsol y no se puede combinar con --engine libglpk.")
+        sys.exit(1)
 
-mrows = re.search(r"Rows:\s+(\d+)", out)
-mcols = re.search(r"Columns:\s+(\d+)", out)
-if mrows:
-    rows = int(mrows.group(1))
-if mcols:
-    cols = int(mcols.group(1))
+    t0 = time.perf_counter()
+    objective_value, cols, rows, assignments, strategy, optimal = solve_portfolio(args.deadline)
+    elapsed = time.perf_counter() - t0
+
+    debug_print("="*25, "RESULTADOS", "="*25)
+    print(f"Estrategia ganadora: {strategy}, Tiempo: {elapsed:.4f}s")
+    if optimal:
+        print(f"Coste total óptimo: {objective_value}, Variables: {cols}, Restricciones: {rows}\n")
+    else:
+        print(f"Coste total (mejor solución encontrada, sin probar optimalidad): {objective_value}, "
+              f"Variables: {cols}, Restricciones: {rows}\n")
+elif args.window is not None:
+    if args.window < 1 or not 0 <= args.overlap < args.window:
+        print("Error: Se requiere --window >= 1 y 0 <= --overlap < --window.")
+        sys.exit(1)
 
-pattern = re.compile(r"[xX]\[(A\d+),(S\d+),(T\d+)\].*?([0-9\.\-Ee]+)")
-for m in pattern.finditer(out):
-    a, s, t, val = m.groups()
-    try:
-        v = float(val)
-        if abs(v - 1.0) < 1e-6:
-            assignments[a] = (s, t)
-    except ValueError:
-        continue
+    objective_value, windows, assignments = solve_rolling(args.window, args.overlap)
+
+    debug_print("="*25, "RESULTADOS", "="*25)
+    for k, (first, last, elapsed, cols, rows, fixed) in enumerate(windows, start=1):
+        print(f"Ventana {k}: franjas S{first+1}-S{last+1}, Tiempo: {elapsed:.4f}s, "
+              f"Variables: {cols}, Restricciones: {rows}, Asignaciones fijadas: {fixed}")
+    total_time = sum(w[2] for w in windows)
+    print(f"Coste total (horizonte rodante): {objective_value}, Ventanas: {len(windows)}, Tiempo total: {total_time:.4f}s\n")
+else:
+    objective_value, cols, rows, assignments = solve(range(m), range(n))
 
-debug_print("="*25, "RESULTADOS", "="*25)
-print(f"Coste total óptimo: {objective_value}, Variables: {cols}, Restricciones: {rows}\n")
+    debug_print("="*25, "RESULTADOS", "="*25)
+    if last_nodes is not None:
+        print(f"Nodos B&B: {last_nodes}")
+    print(f"Coste total óptimo: {objective_value}, Variables: {cols}, Restricciones: {rows}\n")
 
 if assignments:
     for a in sorted(assignments.keys()):
@@ -196,4 +568,4 @@ else:
     print("No se encontraron asignaciones X=1 en la solución.")
 
 debug_print("="*62)
-debug_print("Para más detalles, consulta el fichero output.out")
+debug_print(f"Para más detalles, consulta el fichero {args.glpk_output}")
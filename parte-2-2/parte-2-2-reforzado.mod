@@ -0,0 +1,49 @@
+/* Strengthened formulation of parte-2-2.mod.
+   - Workshops inside a slot are interchangeable, so buses are assigned to
+     slots (w) and a slot takes at most as many buses as free workshops; the
+     workshop is picked afterwards by gen-2.py. This removes the symmetry
+     between workshops that parte-2-2.mod makes glpsol branch over.
+   - y is continuous: with w binary its bounds already force y = w[i] AND w[j].
+   - PairCount: k buses in a slot share k(k-1)/2 pairs, and for every integer q
+     k(k-1)/2 >= q*k - q(q+1)/2. These cuts bound the pairs of a slot from below
+     even when w is fractional, which the y_low rows alone do not. */
+
+/* SETS */
+set AUTOBUSES;
+set TALLERES;
+set FRANJAS;
+
+
+/* PARAMETERS */
+param c{AUTOBUSES, AUTOBUSES};
+param o{FRANJAS, TALLERES} binary;
+param cap{s in FRANJAS} := sum{t in TALLERES} o[s, t];
+
+/* VARIABLES */
+var w{AUTOBUSES, FRANJAS} binary;
+var y {i in AUTOBUSES, j in AUTOBUSES, s in FRANJAS: i < j} >= 0, <= 1;
+
+/* OBJECTIVE FUNCTION */
+minimize TotalImpact:
+  sum{i in AUTOBUSES, j in AUTOBUSES, s in FRANJAS: i < j} y[i,j,s]*c[i,j];
+
+/* CONSTRAINTS */
+s.t. Capacity{s in FRANJAS}:
+  sum{i in AUTOBUSES} w[i, s] <= cap[s];
+
+s.t. Assignation{i in AUTOBUSES}:
+  sum{s in FRANJAS} w[i, s] = 1;
+
+/* definition of the yijs varible (AND logic gate) */
+s.t. y_up1 {i in AUTOBUSES, j in AUTOBUSES, s in FRANJAS: i < j}:
+    y[i,j,s] <= w[i,s];
+
+s.t. y_up2 {i in AUTOBUSES, j in AUTOBUSES, s in FRANJAS: i < j}:
+    y[i,j,s] <= w[j,s];
+
+s.t. y_low {i in AUTOBUSES, j in AUTOBUSES, s in FRANJAS: i < j}:
+    y[i,j,s] >= w[i,s] + w[j,s] - 1;
+
+/* lower bound on the pairs sharing each slot */
+s.t. PairCount {s in FRANJAS, q in 1..min(cap[s], card(AUTOBUSES)) - 1}:
+    sum{i in AUTOBUSES, j in AUTOBUSES: i < j} y[i,j,s] >= q * sum{i in AUTOBUSES} w[i,s] - q*(q+1)/2;
@@ -6,31 +6,92 @@ import time
 import re
 import csv
 import os
+import signal
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+from tamano_modelo import model_size
 
 parser = argparse.ArgumentParser(description="Generate several random input files and collect statistics for model 2.2.")
 parser.add_argument("num_cases", type=int, nargs="?", default=10, help="Number of random cases to generate.")
 parser.add_argument("output_csv", type=str, nargs="?", default="stats2.csv", help="CSV file to store statistics.")
 parser.add_argument("--seed", type=int, default=None, help="Seed for the random number generator.")
 parser.add_argument("--keep-files", action="store_true", help="Do not delete temporary files generated.")
+parser.add_argument("--history", type=str, default="history2.csv", help="CSV with past results used to fit the runtime model (results of this run are appended).")
+parser.add_argument("--formulation", choices=["basica", "reforzada"], default="basica", help="Formulation solved by gen-2.py.")
+parser.add_argument("--portfolio", action="store_true", help="Solve each case with gen-2.py --portfolio and record the winning strategy.")
+parser.add_argument("--jobs", type=int, default=1, help="Number of cases solved concurrently.")
+parser.add_argument("--timeout", type=float, default=60, help="Maximum timeout per case in seconds (used for every case when there is no runtime model).")
+parser.add_argument("--min-timeout", type=float, default=5, help="Minimum adaptive timeout per case in seconds.")
+parser.add_argument("--timeout-factor", type=float, default=5, help="Adaptive timeout as a multiple of the predicted time.")
 args = parser.parse_args()
 
 if args.seed is not None:
     random.seed(args.seed)
 
 csv_path = Path(args.output_csv)
+history_path = Path(args.history)
 # Ensure the old stats file is removed before starting
 if csv_path.exists():
     os.remove(csv_path)
 
+STATS_HEADER = ["case_file", "n_slots", "m_buses", "u_workshops", "optimal_cost", "time_s", "variables", "constraints", "availability_pct"]
+# Timed-out cases are kept with time_s = timeout_s and timed_out = 1 (their real time is a lower bound)
+# optimal = 0 when --portfolio hit its deadline and kept the best incumbent (its time is a lower bound too)
+STATS_COLUMNS = STATS_HEADER + ["predicted_s", "timeout_s", "timed_out", "strategy", "optimal", "nodes"]
+# The history also records how the cases were solved, so only comparable runs are fitted together
+HISTORY_HEADER = STATS_HEADER + ["timed_out", "optimal", "formulation", "portfolio", "jobs"]
+
 if not csv_path.exists():
     with open(csv_path, "w", newline="") as f:
         writer = csv.writer(f)
-        writer.writerow(["case_file", "n_slots", "m_buses", "u_workshops", "optimal_cost", "time_s", "variables", "constraints", "availability_pct"])
+        writer.writerow(STATS_COLUMNS)
+
+
+def features(n, m, u, variables, constraints, availability_pct):
+    """Feature vector of the runtime model (log-log regression on the recorded statistics)."""
+    return np.array([1.0, np.log1p(n), np.log1p(m), np.log1p(u),
+                     np.log1p(variables), np.log1p(constraints), availability_pct / 100])
+
+
+def fit_runtime_model(path):
+    """
+    Fit log(time_s) on the features of past results solved the same way as this run
+    (formulation, portfolio and jobs). Timed-out results are lower bounds: their target
+    is raised to the model's prediction whenever that is larger, and the fit repeated.
+    Returns None if there is not enough history.
+    """
+    if not path.exists():
+        return None
+    hist = pd.read_csv(path)
+    for column in HISTORY_HEADER:
+        if column not in hist:
+            hist[column] = np.nan  # Histories written before the column existed
+    hist = hist[(hist["formulation"] == args.formulation) & (hist["portfolio"] == int(args.portfolio))
+                & (hist["jobs"] == args.jobs)]
+    hist = hist.dropna(subset=["time_s", "variables", "constraints", "timed_out"])
+    if hist.empty:
+        return None
+    X = np.array([features(r.n_slots, r.m_buses, r.u_workshops, r.variables, r.constraints, r.availability_pct)
+                  for r in hist.itertuples()])
+    if len(X) <= 2 * X.shape[1]:
+        return None
+
+    y = np.log(hist["time_s"].to_numpy())
+    censored = (hist["timed_out"].to_numpy() == 1) | (hist["optimal"].to_numpy() == 0)
+    coef, *_ = np.linalg.lstsq(X, y, rcond=None)
+    for _ in range(20):
+        if not censored.any():
+            break
+        target = np.where(censored, np.maximum(y, X @ coef), y)
+        coef, *_ = np.linalg.lstsq(X, target, rcond=None)
+    return coef
+
 
+# --- Generate every case first, so they can be scheduled by predicted cost ---
+cases = []
 for case_idx in range(1, args.num_cases + 1):
     # Generate random case
     n = random.randint(1, 10)  # Number of time slots
@@ -89,64 +150,162 @@ for case_idx in range(1, args.num_cases + 1):
 
     print(f"[{case_idx}] File '{case_file}' generated with n={n} slots, m={m} buses, u={u} workshops.")
 
+    variables, constraints = model_size(O, m, args.formulation)
+    cases.append({"idx": case_idx, "case_file": case_file, "output_dat": output_dat,
+                  "glpk_output": f"random_output_{case_idx}.out",
+                  "n": n, "m": m, "u": u, "variables": variables, "constraints": constraints,
+                  "availability_pct": availability_percentage})
+
+
+# --- Predict each case's runtime and schedule longest-predicted-first ---
+coef = fit_runtime_model(history_path)
+for case in cases:
+    if coef is None:
+        case["predicted_s"] = None
+        case["timeout_s"] = args.timeout
+    else:
+        x = features(case["n"], case["m"], case["u"], case["variables"], case["constraints"], case["availability_pct"])
+        case["predicted_s"] = float(np.exp(x @ coef))
+        case["timeout_s"] = min(max(args.timeout_factor * case["predicted_s"], args.min_timeout), args.timeout)
+
+if coef is None:
+    print(f"Not enough history in '{history_path}' to fit a runtime model: using a {args.timeout}s timeout "
+          f"and ordering by model size.")
+    cases.sort(key=lambda c: c["constraints"], reverse=True)
+else:
+    cases.sort(key=lambda c: c["predicted_s"], reverse=True)
+
+
+def remove_files(files):
+    """Delete the temporary files of a case unless they must be kept."""
+    if args.keep_files:
+        return
+    for f_ in files:
+        try:
+            os.remove(f_)
+        except FileNotFoundError:
+            pass
+
+
+def run_case(case):
+    """Solve one case with gen-2.py. Returns its statistics row (see STATS_COLUMNS), or None if it failed."""
+    case_idx = case["idx"]
+    case_file, output_dat = case["case_file"], case["output_dat"]
+    temp_files = (case_file, output_dat, case["glpk_output"])
+
+    command = ["python3", "gen-2.py", case_file, output_dat, "--glpk-output", case["glpk_output"],
+               "--formulation", args.formulation]
+    if args.portfolio:
+        # Leave some of the timeout for gen-2.py to collect the best incumbent
+        command += ["--portfolio", "--deadline", f"{0.8 * case['timeout_s']:.1f}"]
+
     # Measure execution time
     start_time = time.perf_counter()
+    # gen-2.py runs in its own process group so a timeout also stops the glpsol it started
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, start_new_session=True)
     try:
-        result = subprocess.run(
-            ["python3", "gen-2.py", case_file, output_dat],
-            capture_output=True,
-            text=True,
-            check=True, # Will raise CalledProcessError if gen-2.py returns non-zero
-            timeout=60  # Timeout of 60 seconds to prevent deadlocks
-        )
-    except subprocess.TimeoutExpired as e:
-        print(f"Timeout expired for case {case_idx}. The process was likely deadlocked or taking too long.")
-        print(f"Stdout so far: {e.stdout}")
-        print(f"Stderr so far: {e.stderr}")
-        continue
-    except subprocess.CalledProcessError as e:
+        stdout, stderr = proc.communicate(timeout=case["timeout_s"])  # Adaptive timeout to prevent deadlocks
+    except subprocess.TimeoutExpired:
+        os.killpg(proc.pid, signal.SIGKILL)
+        stdout, stderr = proc.communicate()
+        print(f"Timeout expired for case {case_idx} after {case['timeout_s']:.1f}s. The process was likely deadlocked or taking too long.")
+        print(f"Stdout so far: {stdout}")
+        print(f"Stderr so far: {stderr}")
+        remove_files(temp_files)
+        # Recorded with its timeout as a lower bound of the real time, so the runtime model learns from it
+        return [case_file, case["n"], case["m"], case["u"], None, case["timeout_s"], case["variables"],
+                case["constraints"], case["availability_pct"], case["predicted_s"], case["timeout_s"], 1, None, 0, None]
+    if proc.returncode != 0:
         print(f"Error executing gen-2.py on case {case_idx}")
-        print(e.stderr)
+        print(stderr)
         # Delete files on error
-        if not args.keep_files:
-            for f_ in (case_file, output_dat):
-                try: os.remove(f_)
-                except FileNotFoundError: pass
-        continue
+        remove_files(temp_files)
+        return None
     end_time = time.perf_counter()
     elapsed_time = end_time - start_time
 
     # Parse variables and constraints
-    stdout = result.stdout
-
     # Check if an optimal solution was reported in the output.
     # gen-2.py prints the cost, variables and constraints to stdout.
-    cost_match = re.search(r"Coste total óptimo:\s*([0-9eE.+-]+)", stdout, re.IGNORECASE)
+    # --portfolio may stop at its deadline with the best incumbent, which is reported as not proven optimal
+    cost_match = re.search(r"Coste total (óptimo|\(mejor solución encontrada, sin probar optimalidad\)):\s*([0-9eE.+-]+)",
+                           stdout, re.IGNORECASE)
     if not cost_match:
-        print(f"[{case_idx}] Warning: Optimal solution cost not found in the output of gen-2.py. Skipping case.")
+        print(f"[{case_idx}] Warning: Solution cost not found in the output of gen-2.py. Skipping case.")
         print(f"Stdout from gen-2.py: {stdout.strip()}")
-        continue
+        return None
 
-    optimal_cost = float(cost_match.group(1))
+    optimal = int(cost_match.group(1) == "óptimo")
+    optimal_cost = float(cost_match.group(2))
     vars_match = re.search(r"Variables:\s*(\d+)", stdout, re.IGNORECASE)
     rows_match = re.search(r"Restricciones:\s*(\d+)", stdout, re.IGNORECASE)
     num_vars = int(vars_match.group(1)) if vars_match else None
     num_constraints = int(rows_match.group(1)) if rows_match else None
+    strategy_match = re.search(r"Estrategia ganadora:\s*(\w+)", stdout)
+    strategy = strategy_match.group(1) if strategy_match else None
+    nodes_match = re.search(r"Nodos B&B:\s*(\d+)", stdout)
+    nodes = int(nodes_match.group(1)) if nodes_match else None
 
-    print(f"[{case_idx}] Cost: {optimal_cost}, Time: {elapsed_time:.4f}s, Vars: {num_vars}, Constraints: {num_constraints}")
-
-    # Save statistics
-    with open(csv_path, "a", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow([case_file, n, m, u, optimal_cost, elapsed_time, num_vars, num_constraints, availability_percentage])
+    predicted = f"{case['predicted_s']:.4f}s" if case["predicted_s"] is not None else "-"
+    print(f"[{case_idx}] Cost: {optimal_cost}{'' if optimal else ' (not proven optimal)'}, "
+          f"Time: {elapsed_time:.4f}s (predicted: {predicted}), "
+          f"Vars: {num_vars}, Constraints: {num_constraints}, Nodes: {nodes}")
 
     # 🧹 Clean up temporary files if not requested to keep them
-    if not args.keep_files:
-        for f_ in (case_file, output_dat):
-            try:
-                os.remove(f_)
-            except FileNotFoundError:
-                pass
+    remove_files(temp_files)
+
+    return [case_file, case["n"], case["m"], case["u"], optimal_cost, elapsed_time, num_vars, num_constraints,
+            case["availability_pct"], case["predicted_s"], case["timeout_s"], 0, strategy, optimal, nodes]
+
+
+# --- Run the cases; with several jobs the longest ones start first ---
+results = []
+with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+    futures = [pool.submit(run_case, case) for case in cases]
+    for future in as_completed(futures):
+        row = future.result()
+        if row is None:
+            continue
+        results.append(row)
+        # Save statistics
+        with open(csv_path, "a", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(row)
+
+results = pd.DataFrame(results, columns=STATS_COLUMNS)
+
+# Keep the results as history for the runtime model of future runs
+if not results.empty:
+    new_rows = results[STATS_HEADER + ["timed_out", "optimal"]].assign(
+        formulation=args.formulation, portfolio=int(args.portfolio), jobs=args.jobs)
+    if history_path.exists():
+        new_rows = pd.concat([pd.read_csv(history_path), new_rows], ignore_index=True)
+    new_rows.to_csv(history_path, index=False)
+
+# --- Predicted vs actual time ---
+predicted_rows = results.dropna(subset=["predicted_s"])
+finished = predicted_rows[predicted_rows["timed_out"] == 0]
+timed_out = predicted_rows[predicted_rows["timed_out"] == 1]
+if not finished.empty:
+    predicted = finished["predicted_s"].to_numpy(dtype=float)
+    actual = finished["time_s"].to_numpy(dtype=float)
+    ratio = predicted / actual
+    print(f"\nRuntime model over {len(finished)} finished cases: median predicted/actual = {np.median(ratio):.2f}, "
+          f"mean abs. error = {np.mean(np.abs(predicted - actual)):.4f}s")
+    if len(finished) > 1:
+        corr = np.corrcoef(np.log(predicted), np.log(actual))[0, 1]
+        print(f"Correlation between log(predicted) and log(actual): {corr:.3f}")
+if not timed_out.empty:
+    print(f"{len(timed_out)} of {len(predicted_rows)} predicted cases timed out (actual time > timeout): "
+          f"median predicted/timeout = {np.median(timed_out['predicted_s'] / timed_out['timeout_s']):.2f}. "
+          f"They are fitted as lower bounds in later runs.")
+
+# --- Portfolio: which strategy won each case ---
+if args.portfolio and not results.empty:
+    wins = results.dropna(subset=["strategy"]).groupby("strategy")["optimal"].agg(["count", "sum"])
+    print("\nPortfolio wins per strategy:")
+    for strategy, (count, proven) in wins.sort_values("count", ascending=False).iterrows():
+        print(f"  {strategy}: {count} ({int(proven)} proven optimal, {count - int(proven)} best incumbent at the deadline)")
 
 # --- Create plots ---
 
@@ -198,6 +357,25 @@ plt.grid(True, linestyle='--', alpha=0.7)
 plt.savefig("availability_vs_time_p2.png", dpi=300, bbox_inches='tight')
 plt.show()
 
+# --- Plot 5: Predicted vs Actual Time ---
+df_predicted = df.dropna(subset=['predicted_s'])
+if not df_predicted.empty:
+    plt.figure(figsize=(8,6))
+    killed = df_predicted['timed_out'] == 1
+    plt.scatter(df_predicted.loc[~killed, 'predicted_s'], df_predicted.loc[~killed, 'time_s'], c='red', s=80, alpha=0.7)
+    plt.scatter(df_predicted.loc[killed, 'predicted_s'], df_predicted.loc[killed, 'time_s'],
+                c='black', marker='^', s=80, alpha=0.7, label="Timed out (lower bound)")
+    if killed.any():
+        plt.legend()
+    limit = max(df_predicted['predicted_s'].max(), df_predicted['time_s'].max())
+    plt.plot([0, limit], [0, limit], color='gray', linestyle='--')
+    plt.xlabel("Predicted Time (s)")
+    plt.ylabel("Execution Time (s)")
+    plt.title("Predicted vs. Actual Execution Time")
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.savefig("predicted_vs_actual_p2.png", dpi=300, bbox_inches='tight')
+    plt.show()
+
 # Clean up the statistics file
 if not args.keep_files:
     if csv_path.exists():
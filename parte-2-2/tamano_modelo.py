@@ -0,0 +1,20 @@
+"""
+Tamaño del modelo que glpsol genera para el problema 2.2.2., compartido por
+gen-2.py (informe de --portfolio) y random-cases-2.py (modelo de tiempos).
+"""
+import numpy as np
+
+
+def model_size(O, m, formulation="basica"):
+    """
+    Columnas y filas (objetivo incluido) de parte-2-2.mod (basica) o de
+    parte-2-2-reforzado.mod (reforzada) para m autobuses y la matriz O (n x u).
+    """
+    n = len(O)
+    u = len(O[0]) if n else 0
+    pairs = m * (m - 1) // 2
+    if formulation == "reforzada":
+        capacity = np.asarray(O).reshape(n, u).sum(axis=1, dtype=np.int64)
+        pair_counts = int(np.maximum(np.minimum(capacity, m) - 1, 0).sum())
+        return m * n + pairs * n, n + m + 3 * pairs * n + pair_counts + 1
+    return m * n * u + pairs * n, n * u + m + 3 * pairs * n + 1